@@ -0,0 +1,261 @@
+"""
+Profit, margin and days-to-sell figures across every build.
+
+Builds are loaded once into columns (one array per field) and the figures are worked out
+over whole columns at a time. NumPy is used when it is installed, otherwise the columns
+are plain array.array objects and the same figures are worked out in pure Python.
+"""
+
+from array import array
+from datetime import datetime
+
+from component_codec import string_to_component
+from pc_build import COMPONENT_SLOTS, build_total_price, build_profit
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Quantiles reported for the margin distribution
+MARGIN_QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+
+def _component_name_and_price(value):
+    """Return (name, price) of a stored component without building a Component."""
+    if not value:
+        return None, 0.0
+    if isinstance(value, str):
+        component = string_to_component(value)
+        if component is None:
+            return None, 0.0
+        return component.name, component.price
+    return value["name"], float(value["price"])
+
+
+class _DateParser:
+    """Turns dd/mm/yyyy strings into numbers, caching them as the same dates repeat a lot."""
+    def __init__(self):
+        self._cache = {}
+
+    def parse(self, date):
+        """
+        Return (day ordinal, month number) of the date, where the month number is
+        year * 12 + month - 1. Both are 0 if the date is missing or invalid.
+        """
+        parsed = self._cache.get(date)
+        if parsed is None:
+            try:
+                value = datetime.strptime(date, "%d/%m/%Y")
+                parsed = (value.toordinal(), value.year * 12 + value.month - 1)
+            except (TypeError, ValueError):
+                parsed = (0, 0)
+            self._cache[date] = parsed
+        return parsed
+
+
+def _month_label(month):
+    """Return a month number from _DateParser as 'YYYY-MM'."""
+    return f"{month // 12:04d}-{month % 12 + 1:02d}"
+
+
+class BuildColumns:
+    """
+    Build records held column by column.
+
+    Every column has one entry per build, in the same order as the records it was made from.
+    Dates are day ordinals with 0 for a missing date, and the CPU and GPU models are stored
+    as codes into the cpu_models and gpu_models lists.
+    """
+    def __init__(self, records):
+        dates = _DateParser()
+
+        self.skus = array('q')
+        self.slot_costs = {slot: array('d') for slot in COMPONENT_SLOTS}
+        self.extra_costs = array('d')
+        self.sell_price = array('d')
+        self.target_sell_price = array('d')
+        self.extra_profit = array('d')
+        self.sold = array('b')
+        self.list_date = array('l')
+        self.sell_date = array('l')
+        self.sell_month = array('l')
+
+        self.cpu_models = []
+        self.gpu_models = []
+        self.cpu_codes = array('l')
+        self.gpu_codes = array('l')
+        cpu_lookup = {}
+        gpu_lookup = {}
+        self._realized_profits = None
+
+        for record in records:
+            self.skus.append(int(record["sku"]))
+            for slot in COMPONENT_SLOTS:
+                name, price = _component_name_and_price(record.get(slot))
+                self.slot_costs[slot].append(price)
+                if slot == "cpu":
+                    self.cpu_codes.append(self._model_code(name, cpu_lookup, self.cpu_models))
+                elif slot == "gpu":
+                    self.gpu_codes.append(self._model_code(name, gpu_lookup, self.gpu_models))
+
+            self.extra_costs.append(float(record.get("extra_costs") or 0))
+            self.sell_price.append(float(record.get("sell_price") or 0))
+            self.target_sell_price.append(float(record.get("target_sell_price") or 0))
+            self.extra_profit.append(float(record.get("extra_profit") or 0))
+            self.sold.append(1 if record.get("sold") else 0)
+            self.list_date.append(dates.parse(record.get("list_date"))[0])
+            sell_date, sell_month = dates.parse(record.get("sell_date"))
+            self.sell_date.append(sell_date)
+            self.sell_month.append(sell_month)
+
+        if np is not None:
+            self._to_numpy()
+
+    @staticmethod
+    def _model_code(name, lookup, models):
+        name = name or "Unknown"
+        code = lookup.get(name)
+        if code is None:
+            code = len(models)
+            lookup[name] = code
+            models.append(name)
+        return code
+
+    def _to_numpy(self):
+        self.skus = np.array(self.skus, dtype=np.int64)
+        self.slot_costs = {slot: np.array(column, dtype=np.float64) for slot, column in self.slot_costs.items()}
+        self.extra_costs = np.array(self.extra_costs, dtype=np.float64)
+        self.sell_price = np.array(self.sell_price, dtype=np.float64)
+        self.target_sell_price = np.array(self.target_sell_price, dtype=np.float64)
+        self.extra_profit = np.array(self.extra_profit, dtype=np.float64)
+        self.sold = np.array(self.sold, dtype=bool)
+        self.list_date = np.array(self.list_date, dtype=np.int64)
+        self.sell_date = np.array(self.sell_date, dtype=np.int64)
+        self.sell_month = np.array(self.sell_month, dtype=np.int64)
+        self.cpu_codes = np.array(self.cpu_codes, dtype=np.int64)
+        self.gpu_codes = np.array(self.gpu_codes, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.skus)
+
+    def total_costs(self):
+        """Total price of each build, from pc_build.build_total_price like PCBuild.total_price."""
+        if np is not None:
+            return build_total_price(self.slot_costs, self.extra_costs)
+        slots = list(self.slot_costs)
+        return array('d', (build_total_price(dict(zip(slots, costs)), extra)
+                           for *costs, extra in zip(*self.slot_costs.values(), self.extra_costs)))
+
+    def realized_profits(self):
+        """Profit of each build as it sold, from pc_build.build_profit like to_dict_name's Total Profit."""
+        if self._realized_profits is None:
+            if np is not None:
+                self._realized_profits = build_profit(self.sell_price, self.total_costs(), self.extra_profit)
+            else:
+                self._realized_profits = array('d', (build_profit(sell, cost, extra) for sell, cost, extra
+                                                     in zip(self.sell_price, self.total_costs(), self.extra_profit)))
+        return self._realized_profits
+
+    def total_realized_profit(self):
+        """Total profit over every sold build."""
+        profits = self.realized_profits()
+        if np is not None:
+            return float(profits[self.sold].sum())
+        return sum(profit for profit, sold in zip(profits, self.sold) if sold)
+
+    def margins(self):
+        """Profit as a fraction of the sell price, for sold builds with a sell price."""
+        profits = self.realized_profits()
+        if np is not None:
+            mask = self.sold & (self.sell_price > 0)
+            return profits[mask] / self.sell_price[mask]
+        return array('d', (profit / sell for profit, sell, sold in zip(profits, self.sell_price, self.sold)
+                           if sold and sell > 0))
+
+    def margin_distribution(self, quantiles=MARGIN_QUANTILES):
+        """Return {quantile: margin} over the sold builds, empty if nothing has sold."""
+        margins = self.margins()
+        if len(margins) == 0:
+            return {}
+        if np is not None:
+            return dict(zip(quantiles, (float(value) for value in np.quantile(margins, quantiles))))
+
+        # Linear interpolation between the closest ranks, the same as NumPy's default
+        ordered = sorted(margins)
+        distribution = {}
+        for quantile in quantiles:
+            position = quantile * (len(ordered) - 1)
+            lower = int(position)
+            upper = min(lower + 1, len(ordered) - 1)
+            distribution[quantile] = ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+        return distribution
+
+    def average_days_to_sell(self):
+        """Average days between listing and selling, over sold builds with both dates, or None."""
+        if np is not None:
+            mask = self.sold & (self.list_date > 0) & (self.sell_date > 0)
+            if not mask.any():
+                return None
+            return float((self.sell_date[mask] - self.list_date[mask]).mean())
+
+        days = [sell - listed for sell, listed, sold in zip(self.sell_date, self.list_date, self.sold)
+                if sold and sell > 0 and listed > 0]
+        return sum(days) / len(days) if days else None
+
+    def _profit_by_code(self, codes, code_count, mask):
+        """Sum of realized profit per code for the builds in mask."""
+        profits = self.realized_profits()
+        if np is not None:
+            return np.bincount(codes[mask], weights=profits[mask], minlength=code_count)
+
+        totals = [0.0] * code_count
+        for code, profit, include in zip(codes, profits, mask):
+            if include:
+                totals[code] += profit
+        return totals
+
+    def profit_by_month(self):
+        """Realized profit grouped by the month each build sold in, {'YYYY-MM': profit}."""
+        if np is not None:
+            mask = self.sold & (self.sell_month > 0)
+            months, codes = np.unique(self.sell_month[mask], return_inverse=True)
+            totals = np.bincount(codes, weights=self.realized_profits()[mask], minlength=len(months))
+            return {_month_label(int(month)): float(total) for month, total in zip(months, totals)}
+
+        totals = {}
+        for month, profit, sold in zip(self.sell_month, self.realized_profits(), self.sold):
+            if sold and month > 0:
+                totals[month] = totals.get(month, 0.0) + profit
+        return {_month_label(month): total for month, total in sorted(totals.items())}
+
+    def profit_by_gpu(self):
+        """Realized profit of sold builds grouped by GPU model."""
+        return self._profit_by_model(self.gpu_codes, self.gpu_models)
+
+    def profit_by_cpu(self):
+        """Realized profit of sold builds grouped by CPU model."""
+        return self._profit_by_model(self.cpu_codes, self.cpu_models)
+
+    def _profit_by_model(self, codes, models):
+        totals = self._profit_by_code(codes, len(models), self.sold)
+        return {model: float(total) for model, total in zip(models, totals)}
+
+    def summary(self):
+        """Every figure in one dictionary."""
+        sold_count = int(self.sold.sum()) if np is not None else sum(self.sold)
+        return {
+            "builds": len(self),
+            "sold": sold_count,
+            "total_realized_profit": self.total_realized_profit(),
+            "margin_distribution": self.margin_distribution(),
+            "average_days_to_sell": self.average_days_to_sell(),
+            "profit_by_month": self.profit_by_month(),
+            "profit_by_gpu": self.profit_by_gpu(),
+            "profit_by_cpu": self.profit_by_cpu()
+        }
+
+
+def summarize(storage):
+    """Load every build from the storage into columns and return the summary."""
+    return BuildColumns(storage.get_builds_list()).summary()
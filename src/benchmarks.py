@@ -0,0 +1,434 @@
+"""
+Benchmarks for the parts of the app that get slow as the number of builds grows.
+
+Run from the src folder: python benchmarks.py [name ...]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from components import CPU, GPU, RAM, SSD, HardDrive, NVMe, PSU, Case, Motherboard
+
+
+def _time_per_call(function, repeats):
+    """Return the average time of a call to function in microseconds."""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        function()
+    return (time.perf_counter() - start) / repeats * 1_000_000
+
+
+def benchmark_sku_allocation(occupancies=(0.10, 0.90, 0.99), repeats=2000):
+    """Compare the old random-retry SKU generation against SkuAllocator at different occupancies."""
+    from sku_allocator import SkuAllocator, SKU_RANGE_START, SKU_RANGE_END
+
+    all_skus = range(SKU_RANGE_START, SKU_RANGE_END + 1)
+    for occupancy in occupancies:
+        used_skus = random.sample(all_skus, int(len(all_skus) * occupancy))
+
+        def old_generate():
+            # What generate_unique_sku used to do, minus the file I/O
+            new_sku = random.randint(SKU_RANGE_START, SKU_RANGE_END)
+            while new_sku in used_skus:
+                new_sku = random.randint(SKU_RANGE_START, SKU_RANGE_END)
+            used_skus.append(new_sku)
+            used_skus.pop()
+
+        allocator = SkuAllocator(used_skus)
+
+        def allocate():
+            allocator.release(allocator.allocate())
+
+        print(f"SKU allocation at {occupancy:.0%} occupancy: "
+              f"random retry {_time_per_call(old_generate, repeats):.1f}us, "
+              f"allocator {_time_per_call(allocate, repeats):.1f}us")
+
+
+def _old_string_to_component(component_str):
+    """string_to_component as it was before the component codec, kept here to compare against."""
+    component_type, attrs = component_str.split('(', 1)
+    attrs = attrs.rstrip(')').split(',')
+    name = attrs[0].strip()
+    brand = attrs[1].strip()
+    price = float(attrs[2].strip())
+
+    if component_type == "CPU":
+        return CPU(name, brand, price)
+    elif component_type == "GPU":
+        return GPU(name, brand, price)
+    elif component_type == "SSD":
+        return SSD(name, brand, price)
+    elif component_type == "RAM":
+        return RAM(name, brand, price)
+    elif component_type == "HardDrive":
+        return HardDrive(name, brand, price)
+    elif component_type == "NVMe":
+        return NVMe(name, brand, price)
+    elif component_type == "PSU":
+        return PSU(name, brand, price)
+    elif component_type == "Case":
+        return Case(name, brand, price)
+    elif component_type == "Motherboard":
+        return Motherboard(name, brand, price)
+
+
+def _sample_components(count):
+    from components import COMPONENT_TYPES
+
+    types = list(COMPONENT_TYPES.values())
+    return [types[i % len(types)](f"Part {i % 500}", "Brand", float(i % 300)) for i in range(count)]
+
+
+def benchmark_component_codec(count=1_000_000):
+    """Encode/decode throughput of the old string format against the component codec."""
+    from component_codec import encode_component, decode_component, string_to_component
+
+    components = _sample_components(count)
+
+    def throughput(function, items):
+        start = time.perf_counter()
+        for item in items:
+            function(item)
+        return len(items) / (time.perf_counter() - start)
+
+    old_encoded = [str(component) for component in components]
+    new_encoded = [encode_component(component) for component in components]
+
+    print(f"Component codec over {count:,} components (components/second):")
+    print(f"  old encode (str)             {throughput(str, components):>12,.0f}")
+    print(f"  new encode                   {throughput(encode_component, components):>12,.0f}")
+    print(f"  old decode (split + if/elif) {throughput(_old_string_to_component, old_encoded):>12,.0f}")
+    print(f"  legacy string decode         {throughput(string_to_component, old_encoded):>12,.0f}")
+    print(f"  new decode                   {throughput(decode_component, new_encoded):>12,.0f}")
+
+
+def benchmark_component_memory(build_count=50_000):
+    """Memory used by the components of build_count builds, plain objects against slotted and shared ones."""
+    import json
+    import tracemalloc
+    from component_codec import decode_component, encode_component
+
+    class DictComponent:
+        """A Component as it was before __slots__, for comparison."""
+        def __init__(self, name, brand, price):
+            self.name = name
+            self.brand = brand
+            self.price = price
+
+    # Builds made from a small catalogue of parts, like a real inventory. Going through
+    # json.loads gives every record its own copies of the strings, as loading Builds.json does.
+    parts = _sample_components(9 * 40)
+    records = json.loads(json.dumps([
+        [encode_component(parts[(build * 7 + slot * 40 + build // 40) % len(parts)]) for slot in range(9)]
+        for build in range(build_count)
+    ]))
+
+    def measure(make_component):
+        tracemalloc.start()
+        loaded = [[make_component(value) for value in record] for record in records]
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del loaded
+        return size / build_count
+
+    print(f"Component memory per build with {build_count:,} builds loaded:")
+    print(f"  __dict__ objects   {measure(lambda value: DictComponent(value['name'], value['brand'], value['price'])):>8,.0f} bytes")
+    print(f"  slotted + interned {measure(decode_component):>8,.0f} bytes")
+    print(f"  shared             {measure(lambda value: decode_component(value, shared=True)):>8,.0f} bytes")
+
+
+def _sample_records(count):
+    """Build records like the ones in Builds.json, with dates spread over two years."""
+    from component_codec import encode_component
+    from analytics import COMPONENT_SLOTS
+
+    parts = _sample_components(9 * 40)
+    records = []
+    for i in range(count):
+        record = {slot: encode_component(parts[(i * 7 + index * 40) % len(parts)])
+                  for index, slot in enumerate(COMPONENT_SLOTS)}
+        sold = i % 3 != 0
+        record.update({
+            "sku": 1000 + i,
+            "extra_costs": float(i % 20),
+            "target_sell_price": 1600.0,
+            "extra_profit": float(i % 5),
+            "list_date": f"{i % 28 + 1:02d}/{i % 12 + 1:02d}/2024",
+            "sell_date": f"{(i * 3) % 28 + 1:02d}/{(i // 12) % 12 + 1:02d}/2025" if sold else "",
+            "sold": sold,
+            "sell_price": 1400.0 + i % 400 if sold else 0.0,
+        })
+        records.append(record)
+    return records
+
+
+def benchmark_analytics(count=100_000):
+    """Time loading builds into columns and working out the summary."""
+    import analytics
+
+    records = _sample_records(count)
+
+    start = time.perf_counter()
+    columns = analytics.BuildColumns(records)
+    loaded = time.perf_counter()
+    columns.summary()
+    summarized = time.perf_counter()
+
+    backend = "NumPy" if analytics.np is not None else "array fallback"
+    print(f"Analytics over {count:,} builds ({backend}): load {(loaded - start) * 1000:.0f}ms, "
+          f"summary {(summarized - loaded) * 1000:.1f}ms")
+
+
+def _sample_images(directory, count, size=(1600, 1200)):
+    """Write count camera-sized JPEGs to the directory and return their paths."""
+    from PIL import Image
+
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(count):
+        image = Image.new("RGB", size, (i * 37 % 256, i * 91 % 256, i * 53 % 256))
+        # Noise so the JPEGs are about as big as real photos
+        noise = Image.effect_noise(size, 40).convert("RGB")
+        image = Image.blend(image, noise, 0.5)
+        image.paste((255, 255, 255), (i % 800, 0, i % 800 + 200, size[1]))
+        path = os.path.join(directory, f"{i}.jpg")
+        image.save(path, quality=90)
+        paths.append(path)
+    return paths
+
+
+def benchmark_image_decoding(count=100):
+    """Compare decoding and resizing build images one after another against the image loader's thread pool."""
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    from image_loader import IMAGE_LOADER_THREADS
+    from thumbnail_cache import ThumbnailCache
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = _sample_images(directory, count)
+
+        # A fresh cache for each run so every image really gets decoded
+        cache = ThumbnailCache(os.path.join(directory, "serial"))
+        start = time.perf_counter()
+        first = None
+        for path in paths:
+            cache.get_image(path, 350, 300)
+            if first is None:
+                first = time.perf_counter()
+        serial_first, serial_all = first - start, time.perf_counter() - start
+
+        cache = ThumbnailCache(os.path.join(directory, "threaded"))
+        start = time.perf_counter()
+        first = None
+        with ThreadPoolExecutor(max_workers=IMAGE_LOADER_THREADS) as executor:
+            futures = [executor.submit(cache.get_image, path, 350, 300) for path in paths]
+            for future in as_completed(futures):
+                future.result()
+                if first is None:
+                    first = time.perf_counter()
+        threaded_first, threaded_all = first - start, time.perf_counter() - start
+
+    print(f"Decoding {count} images: serial first {serial_first * 1000:.0f}ms / all {serial_all * 1000:.0f}ms, "
+          f"{IMAGE_LOADER_THREADS} threads first {threaded_first * 1000:.0f}ms / all {threaded_all * 1000:.0f}ms")
+
+
+def benchmark_image_ingest(count=20):
+    """Compare the size and decode time of camera-sized uploads against the ingested images."""
+    from PIL import Image
+    import image_variants
+    from image_ingest import ingest_image
+    from thumbnail_cache import ThumbnailCache
+
+    with tempfile.TemporaryDirectory() as directory:
+        originals = _sample_images(directory, count, size=(4000, 3000))
+        stored_directory = os.path.join(directory, "stored")
+
+        # Keep the variants made while ingesting out of the app's thumbnail cache
+        app_cache = image_variants.thumbnail_cache
+        image_variants.thumbnail_cache = ThumbnailCache(os.path.join(directory, "thumbnails"))
+        try:
+            start = time.perf_counter()
+            results = [ingest_image(path, stored_directory) for path in originals]
+            ingest_time = time.perf_counter() - start
+            # Uploading the same photos again only hashes them
+            duplicates = [ingest_image(path, stored_directory) for path in originals]
+        finally:
+            image_variants.thumbnail_cache = app_cache
+
+        def decode_all(paths):
+            start = time.perf_counter()
+            for path in paths:
+                with Image.open(path) as image:
+                    image.resize((350, 300))
+            return time.perf_counter() - start
+
+        original_decode = decode_all(originals)
+        stored_decode = decode_all([os.path.join(stored_directory, result.file_name) for result in results])
+
+    original_bytes = sum(result.original_bytes for result in results)
+    stored_bytes = sum(result.stored_bytes for result in results)
+    print(f"Ingesting {count} 4000x3000 images took {ingest_time * 1000:.0f}ms, "
+          f"{original_bytes / 1024 / 1024:.1f}MB -> {stored_bytes / 1024 / 1024:.1f}MB "
+          f"({1 - stored_bytes / original_bytes:.0%} saved), "
+          f"{sum(result.deduplicated for result in duplicates)}/{count} re-uploads deduplicated")
+    print(f"Decoding and resizing for the build list: originals {original_decode / count * 1000:.0f}ms each, "
+          f"ingested {stored_decode / count * 1000:.0f}ms each")
+
+
+def benchmark_image_preview(jpeg_count=5, png_count=3):
+    """
+    Compare decoding previews at full size against open_reduced at each quality setting, on
+    12 MP JPEGs and 4K PNGs. The difference is the mean per-pixel error against the full decode.
+    """
+    from PIL import Image, ImageChops, ImageStat
+    from image_variants import open_reduced, PREVIEW_QUALITY_SETTINGS
+
+    preview_size = (300, 200)
+    with tempfile.TemporaryDirectory() as directory:
+        jpegs = _sample_images(os.path.join(directory, "jpeg"), jpeg_count, size=(4000, 3000))
+        pngs = []
+        for i, path in enumerate(_sample_images(os.path.join(directory, "png"), png_count, size=(3840, 2160))):
+            with Image.open(path) as image:
+                png_path = f"{os.path.splitext(path)[0]}.png"
+                image.save(png_path)
+            pngs.append(png_path)
+
+        for label, paths in (("12 MP JPEG", jpegs), ("4K PNG", pngs)):
+            start = time.perf_counter()
+            references = []
+            for path in paths:
+                # What set_preview_image and display_image used to do
+                with Image.open(path) as image:
+                    references.append(image.resize(preview_size, Image.Resampling.LANCZOS))
+            full_time = (time.perf_counter() - start) / len(paths)
+
+            results = [f"full decode {full_time * 1000:.0f}ms"]
+            for quality in PREVIEW_QUALITY_SETTINGS:
+                start = time.perf_counter()
+                previews = []
+                for path in paths:
+                    image, resampling = open_reduced(path, preview_size, quality)
+                    previews.append(image.resize(preview_size, resampling))
+                    image.close()
+                elapsed = (time.perf_counter() - start) / len(paths)
+                difference = sum(sum(ImageStat.Stat(ImageChops.difference(preview, reference)).mean) / 3
+                                 for preview, reference in zip(previews, references)) / len(paths)
+                results.append(f"{quality} {elapsed * 1000:.0f}ms (difference {difference:.2f})")
+            print(f"{label} previews: {', '.join(results)}")
+
+
+def benchmark_export(counts=(10_000, 100_000)):
+    """
+    Peak memory and time of exporting every build from SQLite to CSV, streamed by
+    build_export, against making every PCBuild and to_dict_name() first and writing those.
+    """
+    import csv
+    import tracemalloc
+    from build_export import export_builds
+    from pc_build import PCBuild
+    from storage import SqliteBuildStorage
+
+    template = _sample_records(10_000)
+    with tempfile.TemporaryDirectory() as directory:
+        storage = SqliteBuildStorage(os.path.join(directory, "Builds.db"))
+        stored = 0
+        for count in counts:
+            # Saved in chunks so the records are never all in memory at once
+            while stored < count:
+                chunk = min(len(template), count - stored)
+                storage.save_builds([dict(record, sku=100_000 + stored + i) for i, record in enumerate(template[:chunk])])
+                stored += chunk
+
+            def streamed(file):
+                export_builds(storage, file)
+
+            def materialized(file):
+                rows = [PCBuild.from_record(record).to_dict_name() for record in storage.get_builds_list()]
+                writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+                writer.writeheader()
+                writer.writerows(rows)
+
+            results = []
+            for label, export in (("to_dict_name list", materialized), ("streamed", streamed)):
+                with open(os.devnull, 'w', newline='') as file:
+                    tracemalloc.start()
+                    start = time.perf_counter()
+                    export(file)
+                    elapsed = time.perf_counter() - start
+                    _, peak = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+                results.append(f"{label} {elapsed:.2f}s peak {peak / 1024 / 1024:.1f}MB")
+            print(f"Export {count:,} builds: {', '.join(results)}")
+        storage.close()
+
+
+def benchmark_build_store(count=20_000, lookups=200):
+    """
+    Time opening the store and reading single builds, and saving a change to one build,
+    with Builds.json against Builds.jsonl and its SKU index.
+    """
+    import json
+    from storage import JsonBuildStorage, JsonlBuildStorage
+
+    records = _sample_records(count)
+    skus = [record["sku"] for record in random.sample(records, lookups)]
+    with tempfile.TemporaryDirectory() as directory:
+        skus_path = os.path.join(directory, "SKUS.json")
+        with open(skus_path, 'w') as file:
+            json.dump({"SKUS": [record["sku"] for record in records]}, file)
+        json_path = os.path.join(directory, "Builds.json")
+        with open(json_path, 'w') as file:
+            json.dump({"builds": records}, file, indent=4)
+        jsonl_path = os.path.join(directory, "Builds.jsonl")
+        store = JsonlBuildStorage(jsonl_path, skus_path)
+        store.save_builds(records)
+        store.close()
+
+        for label, open_store in (("Builds.json", lambda: JsonBuildStorage(json_path, skus_path)),
+                                  ("Builds.jsonl", lambda: JsonlBuildStorage(jsonl_path, skus_path))):
+            start = time.perf_counter()
+            store = open_store()
+            store.get_build(skus[0])
+            first_read = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for sku in skus:
+                store.get_build(sku)
+            read = (time.perf_counter() - start) / len(skus)
+
+            start = time.perf_counter()
+            for sku in skus[:20]:
+                store.save_build(sku, {"sell_price": 1234.0})
+                # The JSON store writes in the background, so wait for the file to be written
+                store.flush()
+            save = (time.perf_counter() - start) / 20
+            store.close()
+            print(f"{label} with {count:,} builds: open and first read {first_read * 1000:.1f}ms, "
+                  f"then {read * 1_000_000:.1f}us per read, {save * 1000:.2f}ms per saved change")
+
+
+BENCHMARKS = {
+    "sku_allocation": benchmark_sku_allocation,
+    "component_codec": benchmark_component_codec,
+    "component_memory": benchmark_component_memory,
+    "analytics": benchmark_analytics,
+    "image_decoding": benchmark_image_decoding,
+    "image_ingest": benchmark_image_ingest,
+    "image_preview": benchmark_image_preview,
+    "export": benchmark_export,
+    "build_store": benchmark_build_store,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run PC Flipping benchmarks.")
+    parser.add_argument("names", nargs="*", help=f"Benchmarks to run, default is all of: {', '.join(BENCHMARKS)}")
+    args = parser.parse_args()
+    for name in args.names:
+        if name not in BENCHMARKS:
+            parser.error(f"Unknown benchmark {name}")
+
+    for name in args.names or BENCHMARKS:
+        BENCHMARKS[name]()
@@ -0,0 +1,154 @@
+"""
+Exporting builds and sales to CSV or JSONL, one row at a time.
+
+Rows are made straight from the build records as storage yields them and written to the
+file as they go. No PCBuild or to_dict_name() dictionary is made and no list of rows is
+kept, so memory doesn't grow with the number of builds exported. With the SQLite backend
+the records are read from a cursor too, so nothing is held for the whole store at all.
+
+The component columns match the ones build_import reads, so an export can be imported again.
+"""
+
+import csv
+import json
+
+from component_codec import string_to_component
+from pc_build import COMPONENT_SLOTS, build_total_price, build_profit
+
+EXPORT_FORMATS = ("csv", "jsonl")
+
+
+def _component_parts(value):
+    """
+    Return (name, brand, price) of a stored component without building a Component,
+    all None if the slot is empty.
+    """
+    if not value:
+        return None, None, None
+    if isinstance(value, str):
+        component = string_to_component(value)
+        if component is None:
+            return None, None, None
+        return component.name, component.brand, component.price
+    return value["name"], value["brand"], float(value["price"])
+
+
+def record_parts(record):
+    """Decode every component of a record once, slot -> (name, brand, price)."""
+    return {slot: _component_parts(record.get(slot)) for slot in COMPONENT_SLOTS}
+
+
+# The computed columns take the record and its record_parts, so a row decodes each component once
+
+def total_price(record, parts):
+    """Total price from pc_build.build_total_price, as PCBuild.total_price works it out."""
+    slot_prices = {slot: price or 0.0 for slot, (_, _, price) in parts.items()}
+    return build_total_price(slot_prices, float(record.get("extra_costs") or 0))
+
+
+def target_profit(record, parts):
+    """Profit at the target sell price from pc_build.build_profit, as PCBuild.target_profit."""
+    return build_profit(float(record.get("target_sell_price") or 0), total_price(record, parts),
+                        float(record.get("extra_profit") or 0))
+
+
+def realized_profit(record, parts):
+    """Profit the build sold for from pc_build.build_profit, as to_dict_name's Total Profit. None if it hasn't sold."""
+    if not record.get("sold"):
+        return None
+    return build_profit(float(record.get("sell_price") or 0), total_price(record, parts),
+                        float(record.get("extra_profit") or 0))
+
+
+def _field(name):
+    return lambda record, parts: record.get(name)
+
+
+def _component_column(slot, part):
+    return lambda record, parts: parts[slot][part]
+
+
+# Worked out from the record rather than stored in it
+COMPUTED_COLUMNS = {
+    "total_price": total_price,
+    "target_profit": target_profit,
+    "realized_profit": realized_profit,
+}
+
+
+def _all_columns():
+    columns = {"sku": _field("sku")}
+    for slot in COMPONENT_SLOTS:
+        columns[f"{slot}_name"] = _component_column(slot, 0)
+        columns[f"{slot}_brand"] = _component_column(slot, 1)
+        columns[f"{slot}_price"] = _component_column(slot, 2)
+    for name in ("extra_costs", "target_sell_price", "extra_profit", "list_date", "sell_date",
+                 "sold", "sell_price", "image_file_name"):
+        columns[name] = _field(name)
+    columns.update(COMPUTED_COLUMNS)
+    return columns
+
+
+# Every column that can be exported, name -> function(record, record_parts(record)) -> value
+COLUMNS = _all_columns()
+DEFAULT_COLUMNS = tuple(name for name in COLUMNS if name != "target_profit")
+
+
+def check_columns(columns):
+    """Raise ValueError if any of the column names can't be exported."""
+    unknown = [name for name in columns if name not in COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(unknown)}. Columns are: {', '.join(COLUMNS)}")
+
+
+def iter_rows(records, columns=DEFAULT_COLUMNS):
+    """Yield a tuple of the column values for each record, as the records come in."""
+    getters = [COLUMNS[name] for name in columns]
+    for record in records:
+        parts = record_parts(record)
+        yield tuple(getter(record, parts) for getter in getters)
+
+
+def write_csv(rows, columns, file):
+    """Write rows to an open text file as CSV with a header, returning how many were written."""
+    writer = csv.writer(file)
+    writer.writerow(columns)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def write_jsonl(rows, columns, file):
+    """Write rows to an open text file as one JSON object per line, returning how many were written."""
+    count = 0
+    for row in rows:
+        file.write(json.dumps(dict(zip(columns, row))))
+        file.write('\n')
+        count += 1
+    return count
+
+
+WRITERS = {
+    "csv": write_csv,
+    "jsonl": write_jsonl,
+}
+
+
+def export_builds(storage, file, file_format="csv", columns=DEFAULT_COLUMNS,
+                  sold=None, date_field="list_date", since=None, until=None):
+    """
+    Stream builds from storage into an open text file.
+
+    :param file_format: "csv" or "jsonl".
+    :param columns: Names from COLUMNS, in the order they are written.
+    :param sold: Only sold builds if True, only unsold builds if False.
+    :param date_field: "list_date" or "sell_date", the date since and until apply to.
+    :param since: Only builds with the date on or after this yyyy-mm-dd date.
+    :param until: Only builds with the date on or before this yyyy-mm-dd date.
+    :return: The number of builds written.
+    """
+    check_columns(columns)
+    records = storage.iter_builds(sold=sold, date_field=date_field, since=since, until=until)
+    return WRITERS[file_format](iter_rows(records, columns), columns, file)
@@ -0,0 +1,94 @@
+from tkinter import END
+
+from pc_build import PCBuild, COMPONENT_SLOTS, OPTIONAL_SLOTS
+
+COMPONENT_FIELDS = ("name", "brand", "price")
+# What the form's amounts start as for a new build
+DEFAULT_AMOUNT = "0.00"
+# Fields under the "extras" slot, and whether each one is a number. Numbers start as
+# DEFAULT_AMOUNT and the dates start empty.
+EXTRA_FIELDS = {
+    "extra_costs": True,
+    "target_sell_price": True,
+    "extra_profit": True,
+    "list_date": False,
+    "sell_date": False,
+    "sell_price": True,
+}
+
+
+class BuildForm:
+    """
+    The add/edit build form, with every ComponentEntry registered under a (slot, field) key,
+    e.g. ("cpu", "price"), ("ssd", "checkbox") or ("extras", "sell_date").
+
+    load fills the whole form in from a PCBuild and dump reads it back out as one, each a
+    single pass over the registry with no searching through widgets.
+    """
+    def __init__(self):
+        self.fields = {}
+
+    def bind(self, slot, field, component):
+        """Register the ComponentEntry for a field."""
+        self.fields[(slot, field)] = component
+
+    def get(self, slot, field):
+        return self.fields[(slot, field)].entry.get()
+
+    def set(self, slot, field, value):
+        entry = self.fields[(slot, field)].entry
+        entry.delete(0, END)
+        if value is not None:
+            entry.insert(0, str(value))
+
+    def reset(self):
+        """Put every field back to how it starts for a new build."""
+        for slot in COMPONENT_SLOTS:
+            if slot in OPTIONAL_SLOTS:
+                self.fields[(slot, "checkbox")].is_checked.set(False)
+            self.set(slot, "name", None)
+            self.set(slot, "brand", None)
+            self.set(slot, "price", DEFAULT_AMOUNT)
+
+        for field, is_number in EXTRA_FIELDS.items():
+            self.set("extras", field, DEFAULT_AMOUNT if is_number else None)
+
+    def load(self, build):
+        """Fill the form in with a PCBuild."""
+        for slot in COMPONENT_SLOTS:
+            component = getattr(build, slot)
+            if slot in OPTIONAL_SLOTS:
+                self.fields[(slot, "checkbox")].is_checked.set(component is not None)
+            if component is None:
+                continue
+            self.set(slot, "name", component.name)
+            self.set(slot, "brand", component.brand)
+            self.set(slot, "price", component.price)
+
+        for field in EXTRA_FIELDS:
+            self.set("extras", field, getattr(build, field))
+
+    def _component(self, slot):
+        if slot in OPTIONAL_SLOTS and not self.fields[(slot, "checkbox")].is_checked.get():
+            return None
+        return COMPONENT_SLOTS[slot](name=self.get(slot, "name"), brand=self.get(slot, "brand"),
+                                     price=float(self.get(slot, "price")))
+
+    def dump(self, sku):
+        """
+        Read the form back out as a new PCBuild that hasn't been saved yet.
+
+        :raises ValueError: If a price or amount isn't a number.
+        """
+        extras = {field: float(self.get("extras", field)) if is_number else self.get("extras", field)
+                  for field, is_number in EXTRA_FIELDS.items()}
+        sell_price = extras.pop("sell_price")
+
+        build = PCBuild(
+            sku=sku,
+            **{slot: self._component(slot) for slot in COMPONENT_SLOTS},
+            **extras,
+            persist=False
+        )
+        build.sell_price = sell_price
+        return build
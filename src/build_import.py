@@ -0,0 +1,221 @@
+"""
+Importing builds in bulk from CSV or JSONL files, without the GUI.
+
+Each row is one build. CSV files have a header row with a name, brand and price column per
+component slot (cpu_name, cpu_brand, cpu_price, gpu_name, ...) plus the build's own fields:
+extra_costs, target_sell_price, extra_profit, list_date, sell_date, sold, sell_price,
+image_file_name and sku. JSONL rows can use the same flat keys, or hold each component the
+way Builds.json does, e.g. "cpu": {"type": "CPU", "name": ..., "brand": ..., "price": ...}.
+
+Only the CPU, GPU, RAM, motherboard, PSU and case are needed, and a row without a SKU gets
+a new one. Every row is checked before anything is written, and all of the valid builds are
+then saved with a single storage write.
+"""
+
+import csv
+import json
+import os
+import time
+
+from component_codec import decode_component
+from pc_build import PCBuild, COMPONENT_SLOTS, OPTIONAL_SLOTS
+from sku_allocator import SkuRangeExhaustedError
+from storage import to_iso_date
+
+# Build fields that are amounts of money, missing ones are 0
+AMOUNT_FIELDS = ("extra_costs", "target_sell_price", "extra_profit", "sell_price")
+DATE_FIELDS = ("list_date", "sell_date")
+TRUE_VALUES = {"true", "yes", "y", "1"}
+FALSE_VALUES = {"false", "no", "n", "0", ""}
+
+IMPORT_FORMATS = ("csv", "jsonl")
+
+
+class ImportResult:
+    """What import_builds did, with a message for every row that was skipped."""
+    def __init__(self):
+        self.imported = 0
+        self.skipped = 0
+        self.errors = []
+        self.skus = []
+        self.seconds = 0.0
+
+    def add_error(self, line_number, message):
+        self.errors.append(f"Line {line_number}: {message}")
+        self.skipped += 1
+
+
+def detect_format(path):
+    """Work out the format of an import file from its extension."""
+    extension = os.path.splitext(path)[1].lower().lstrip('.')
+    if extension == "json":
+        extension = "jsonl"
+    if extension not in IMPORT_FORMATS:
+        raise ValueError(f"Can't tell the format of {path}, expected one of: {', '.join(IMPORT_FORMATS)}")
+    return extension
+
+
+def read_rows(file, file_format):
+    """
+    Yield (line number, row dictionary) for every row of an open CSV or JSONL file.
+    A JSONL line that isn't a JSON object is yielded as its ValueError instead of a row.
+    """
+    if file_format == "csv":
+        reader = csv.DictReader(file)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line_number, line in enumerate(file, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, ValueError(f"not valid JSON: {e}")
+            continue
+        if not isinstance(row, dict):
+            yield line_number, ValueError("expected a JSON object")
+            continue
+        yield line_number, row
+
+
+def _text(row, key):
+    value = row.get(key)
+    return "" if value is None else str(value).strip()
+
+
+def _amount(value, label):
+    if value is None or value == "":
+        return 0.0
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{label} '{value}' isn't a number")
+
+
+def _flag(value, label):
+    if isinstance(value, bool):
+        return value
+    text = "" if value is None else str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise ValueError(f"{label} '{value}' isn't true or false")
+
+
+def _component(row, slot):
+    """Read a slot's component from a row, None if an optional slot is empty."""
+    stored = row.get(slot)
+    if stored:
+        # A component as it is stored in Builds.json, in either format
+        if isinstance(stored, str) and '(' not in stored:
+            raise ValueError(f"{slot} '{stored}' isn't a stored component")
+        component = decode_component(stored)
+        if component is None or not isinstance(component, COMPONENT_SLOTS[slot]):
+            raise ValueError(f"{slot} '{stored}' isn't a {COMPONENT_SLOTS[slot].__name__}")
+        return component
+
+    name = _text(row, f"{slot}_name")
+    if not name:
+        if slot in OPTIONAL_SLOTS:
+            return None
+        raise ValueError(f"{slot}_name is missing")
+    price = _amount(row.get(f"{slot}_price"), f"{slot}_price")
+    return COMPONENT_SLOTS[slot](name=name, brand=_text(row, f"{slot}_brand"), price=price)
+
+
+def parse_row(row):
+    """
+    Check a row and turn it into a build record, still without its SKU if the row has none.
+
+    :return: (SKU from the row or None, build record as produced by PCBuild.to_dict())
+    :raises ValueError: If anything in the row is missing or invalid.
+    """
+    sku = _text(row, "sku")
+    if sku:
+        try:
+            sku = int(sku)
+        except ValueError:
+            raise ValueError(f"sku '{sku}' isn't a whole number")
+    else:
+        sku = None
+
+    components = {slot: _component(row, slot) for slot in COMPONENT_SLOTS}
+    amounts = {field: _amount(row.get(field), field) for field in AMOUNT_FIELDS}
+    dates = {}
+    for field in DATE_FIELDS:
+        date = _text(row, field)
+        if date and to_iso_date(date) is None:
+            raise ValueError(f"{field} '{date}' isn't a dd/mm/yyyy date")
+        dates[field] = date
+    sold = _flag(row.get("sold"), "sold")
+
+    sell_price = amounts.pop("sell_price")
+    build = PCBuild(sku=sku, **components, **amounts, **dates, persist=False)
+    build.sold = sold
+    build.sell_price = sell_price
+    # Builds without an image name get <sku>.png, once they have a SKU
+    build.image_file_name = _text(row, "image_file_name") or None
+    return sku, build.to_dict()
+
+
+def import_builds(path, storage, file_format=None, strict=False, dry_run=False):
+    """
+    Import every build in a CSV or JSONL file into the storage.
+
+    Rows are checked first, then SKUs are leased for them in one go: the ones the rows give
+    are reserved and the rest are allocated. All of the builds are then saved with a single
+    save_builds, so there is one write for the whole file instead of one per build.
+
+    :param file_format: "csv" or "jsonl", worked out from the extension if not given.
+    :param strict: Import nothing if any row is invalid, instead of skipping the bad rows.
+    :param dry_run: Check the file and work out SKUs without saving anything.
+    :return: An ImportResult.
+    :raises SkuRangeExhaustedError: If there aren't enough free SKUs for the rows without one.
+    """
+    start = time.perf_counter()
+    file_format = file_format or detect_format(path)
+    result = ImportResult()
+
+    # Record of every valid row
+    parsed = []
+    with open(path, 'r', newline='', encoding='utf-8-sig') as file:
+        for line_number, row in read_rows(file, file_format):
+            try:
+                if isinstance(row, Exception):
+                    raise row
+                sku, record = parse_row(row)
+                if sku is not None and not storage.reserve_sku(sku):
+                    raise ValueError(f"SKU {sku} is already used")
+            except (KeyError, TypeError, ValueError) as e:
+                result.add_error(line_number, e)
+                continue
+            parsed.append(record)
+
+    if strict and result.errors:
+        storage.release_sku_leases()
+        result.skipped += len(parsed)
+        result.seconds = time.perf_counter() - start
+        return result
+
+    try:
+        new_skus = iter(storage.lease_skus(sum(1 for record in parsed if record["sku"] is None)))
+    except SkuRangeExhaustedError:
+        storage.release_sku_leases()
+        raise
+    for record in parsed:
+        if record["sku"] is None:
+            record["sku"] = next(new_skus)
+        if record["image_file_name"] is None:
+            record["image_file_name"] = f"{record['sku']}.png"
+
+    if dry_run:
+        storage.release_sku_leases()
+    else:
+        storage.save_builds(parsed)
+    result.imported = len(parsed)
+    result.skus = [record["sku"] for record in parsed]
+    result.seconds = time.perf_counter() - start
+    return result
@@ -0,0 +1,191 @@
+import json
+import os
+import threading
+
+# Compact the journal into a fresh snapshot once the log grows past this many bytes
+COMPACT_THRESHOLD_BYTES = 256 * 1024
+
+
+class BuildJournal:
+    """
+    Append-only journal of build changes on top of a Builds.json snapshot.
+
+    Each change is appended to the log as one small JSON line, e.g.
+    {"sku": 1234, "set": {"sold": true, "sell_price": 550.0}}, instead of rewriting the
+    whole of Builds.json. Reading replays the log over the snapshot. Once the log passes
+    the compaction threshold it is folded into a new snapshot on a background thread.
+    """
+    def __init__(self, snapshot_path, log_path=None, compact_threshold=COMPACT_THRESHOLD_BYTES):
+        """
+        :param snapshot_path: Path to the Builds.json snapshot.
+        :param log_path: Path to the journal, defaults to the snapshot path with a .log.jsonl extension.
+        :param compact_threshold: Log size in bytes that triggers a compaction.
+        """
+        self.snapshot_path = snapshot_path
+        self.log_path = log_path or os.path.splitext(snapshot_path)[0] + '.log.jsonl'
+        # The log is renamed to this while it is being compacted, so appends can carry on
+        self.compacting_path = self.log_path + '.compacting'
+        self.compact_threshold = compact_threshold
+
+        self._lock = threading.Lock()
+        self._compaction_lock = threading.Lock()
+        self._compaction_thread = None
+
+        self.appends = 0
+        self.bytes_appended = 0
+        self.compactions = 0
+
+    def paths(self):
+        """Return every file that makes up the current state, in replay order."""
+        return [self.snapshot_path, self.compacting_path, self.log_path]
+
+    def _read_snapshot(self):
+        if not os.path.exists(self.snapshot_path):
+            return []
+        with open(self.snapshot_path, 'r') as file:
+            data = json.load(file)
+        return data.get('builds') or []
+
+    @staticmethod
+    def _replay_log(log_path, builds, index):
+        """Apply every entry of a log file to the builds list in place."""
+        if not os.path.exists(log_path):
+            return
+        with open(log_path, 'r') as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final line from a crash mid-append, everything before it is fine
+                    print(f"Skipping unreadable journal entry in {log_path}.")
+                    continue
+
+                key = str(entry['sku'])
+                build = index.get(key)
+                if build is None:
+                    build = {"sku": entry['sku']}
+                    builds.append(build)
+                    index[key] = build
+                build.update(entry['set'])
+
+    def _replay_unlocked(self, include_log=True):
+        builds = self._read_snapshot()
+        index = {str(build.get('sku')): build for build in builds}
+        self._replay_log(self.compacting_path, builds, index)
+        if include_log:
+            self._replay_log(self.log_path, builds, index)
+        return builds
+
+    def replay(self):
+        """Return the list of builds with every journaled change applied."""
+        with self._lock:
+            return self._replay_unlocked()
+
+    def has_pending(self):
+        """Return True if there are journaled changes that aren't in the snapshot yet."""
+        return os.path.exists(self.log_path) or os.path.exists(self.compacting_path)
+
+    def log_size(self):
+        try:
+            return os.path.getsize(self.log_path)
+        except FileNotFoundError:
+            return 0
+
+    def append(self, sku, changes):
+        """
+        Append a change to the journal.
+
+        :param sku: The SKU of the build that changed.
+        :param changes: A dictionary with only the fields that changed.
+        """
+        self.append_many([(sku, changes)])
+
+    def append_many(self, changes):
+        """Append many (sku, changes) pairs to the journal with a single write and fsync."""
+        lines = ''.join(json.dumps({"sku": sku, "set": build_changes}) + '\n' for sku, build_changes in changes)
+        if not lines:
+            return
+        with self._lock:
+            with open(self.log_path, 'a+b') as file:
+                self._truncate_torn_tail(file)
+                file.write(lines.encode('utf-8'))
+                file.flush()
+                os.fsync(file.fileno())
+            self.appends += len(changes)
+            self.bytes_appended += len(lines)
+
+        if self.log_size() >= self.compact_threshold:
+            self.compact_in_background()
+
+    def _truncate_torn_tail(self, file):
+        """
+        Cut off a partial last line left by a crash mid-append. Otherwise the next entry
+        would be written onto the end of it and be unreadable too.
+        """
+        size = file.seek(0, os.SEEK_END)
+        if size == 0:
+            return
+        file.seek(size - 1)
+        if file.read(1) == b'\n':
+            return
+
+        # Look back for the end of the last whole entry
+        keep = 0
+        end = size
+        while end > 0:
+            start = max(0, end - 4096)
+            file.seek(start)
+            newline = file.read(end - start).rfind(b'\n')
+            if newline != -1:
+                keep = start + newline + 1
+                break
+            end = start
+        print(f"Dropping an incomplete journal entry at the end of {self.log_path}.")
+        file.truncate(keep)
+
+    def _write_temp_snapshot(self, builds):
+        """Write the builds next to the snapshot, ready to be swapped in with os.replace."""
+        temp_path = self.snapshot_path + '.compact.tmp'
+        with open(temp_path, 'w') as file:
+            json.dump({"builds": builds}, file, indent=4)
+            file.flush()
+            os.fsync(file.fileno())
+        return temp_path
+
+    def compact(self):
+        """Fold the journal into a fresh snapshot and start a new, empty log."""
+        with self._compaction_lock:
+            # Finishing an interrupted compaction leaves the live log behind, so go round again
+            while self.has_pending():
+                self._compact()
+
+    def _compact(self):
+        with self._lock:
+            # A leftover file from an interrupted compaction is finished first, the live log waits
+            if not os.path.exists(self.compacting_path):
+                if not os.path.exists(self.log_path):
+                    return
+                os.replace(self.log_path, self.compacting_path)
+
+            # Appends only touch the live log, so only the snapshot swap needs the lock
+            builds = self._replay_unlocked(include_log=False)
+
+        temp_path = self._write_temp_snapshot(builds)
+
+        with self._lock:
+            os.replace(temp_path, self.snapshot_path)
+            os.remove(self.compacting_path)
+            self.compactions += 1
+        print(f"Compacted build journal into {self.snapshot_path}.")
+
+    def compact_in_background(self):
+        """Start a compaction on a worker thread unless one is already running."""
+        if self._compaction_thread is not None and self._compaction_thread.is_alive():
+            return
+        self._compaction_thread = threading.Thread(target=self.compact, daemon=True)
+        self._compaction_thread.start()
+
+    def wait_for_compaction(self):
+        """Block until a running background compaction has finished."""
+        if self._compaction_thread is not None:
+            self._compaction_thread.join()
@@ -0,0 +1,113 @@
+import json
+import os
+
+
+class BuildRepository:
+    """
+    In-memory, SKU indexed view of Builds.json.
+
+    The file is parsed once and kept in memory. It is only parsed again when its
+    modification time or size changes, so looking up a build is a dict lookup instead
+    of a full re-read and linear scan of the file.
+
+    If a BuildJournal is given, its log is replayed over the file and changes to the
+    log also count as changes to the file.
+    """
+    def __init__(self, file_path, journal=None):
+        self.file_path = file_path
+        self.journal = journal
+        self._builds = []
+        self._index = {}
+        self._signature = None
+
+    @staticmethod
+    def _stat_signature(path):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _file_signature(self):
+        """Return (mtime, size) of the builds file, or None if it doesn't exist."""
+        if self.journal is not None:
+            return tuple(self._stat_signature(path) for path in self.journal.paths())
+        return self._stat_signature(self.file_path)
+
+    def _load(self):
+        """Parse the builds file and rebuild the SKU index."""
+        if self.journal is not None:
+            builds = self.journal.replay()
+        elif os.path.exists(self.file_path):
+            with open(self.file_path, 'r') as file:
+                data = json.load(file)
+            builds = data.get('builds') or []
+        else:
+            print(f"No builds file found at {self.file_path}.")
+            builds = []
+
+        self._builds = builds
+        # SKUs are stored as ints but compared as strings everywhere else, so key on str
+        self._index = {str(build.get('sku')): build for build in builds}
+
+    def refresh(self):
+        """Reload the builds file if it has changed since it was last parsed."""
+        signature = self._file_signature()
+        if signature != self._signature:
+            self._load()
+            self._signature = signature
+
+    def mark_current(self):
+        """Record that the builds file now matches the in-memory builds, e.g. after writing it."""
+        self._signature = self._file_signature()
+
+    def apply(self, sku, changes):
+        """
+        Apply a change that has just been journaled to the in-memory copy of the builds.
+
+        :param sku: The SKU of the build that changed.
+        :param changes: A dictionary with only the fields that changed.
+        """
+        self.apply_many([(sku, changes)])
+
+    def apply_many(self, changes):
+        """Apply many (sku, changes) pairs at once, checking the builds file only once."""
+        self.refresh()
+        for sku, build_changes in changes:
+            build = self._index.get(str(sku))
+            if build is None:
+                build = {"sku": sku}
+                self._builds.append(build)
+                self._index[str(sku)] = build
+            build.update(build_changes)
+        self._signature = self._file_signature()
+
+    def invalidate(self):
+        """Force the next access to re-read the builds file."""
+        self._signature = None
+        self._builds = []
+        self._index = {}
+
+    def get(self, sku):
+        """Return the build record for the given SKU, or None if there isn't one."""
+        self.refresh()
+        return self._index.get(str(sku))
+
+    def all(self):
+        """Return every build record in file order."""
+        self.refresh()
+        return list(self._builds)
+
+    def iter_unsold(self):
+        """Yield the build records that haven't been sold yet."""
+        self.refresh()
+        for build in self._builds:
+            if not build.get('sold', False):
+                yield build
+
+    def __contains__(self, sku):
+        return self.get(sku) is not None
+
+    def __len__(self):
+        self.refresh()
+        return len(self._builds)
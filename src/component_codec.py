@@ -0,0 +1,92 @@
+"""
+Encoding components for storage.
+
+Components used to be stored as strings like "GPU(RTX 2060 SUper, AMD, 175.0)", which
+can't be parsed reliably once a name contains a comma or a bracket. They are now stored
+as objects, e.g. {"v": 2, "type": "GPU", "name": "RTX 2060 SUper", "brand": "AMD", "price": 175.0}.
+Both forms can be decoded, so builds saved in the old format still load.
+"""
+
+from components import COMPONENT_TYPES
+
+# Version 1 is the old "ClassName(name, brand, price)" string
+COMPONENT_FORMAT_VERSION = 2
+
+
+def encode_component(component):
+    """Convert a Component to the structure stored in a build record, None stays None."""
+    if component is None:
+        return None
+    return {
+        "v": COMPONENT_FORMAT_VERSION,
+        "type": component.__class__.__name__,
+        "name": component.name,
+        "brand": component.brand,
+        "price": component.price
+    }
+
+
+def decode_component(value, shared=False):
+    """
+    Convert a stored component back to a Component object.
+    Accepts the current object format and the old string format.
+
+    :param shared: Return a shared component from Component.shared instead of a new one.
+    """
+    if not value:
+        return None
+    if isinstance(value, str):
+        component = string_to_component(value)
+        if shared and component is not None:
+            component = type(component).shared(component.name, component.brand, component.price)
+        return component
+    if not isinstance(value, dict):
+        raise ValueError(f"Unsupported component value: {value!r}")
+
+    version = value.get("v", COMPONENT_FORMAT_VERSION)
+    if version != COMPONENT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported component format version {version}: {value}")
+
+    component_class = COMPONENT_TYPES.get(value["type"])
+    if component_class is None:
+        raise ValueError(f"Unknown component type: {value['type']} in {value}")
+    if shared:
+        return component_class.shared(value["name"], value["brand"], float(value["price"]))
+    return component_class(value["name"], value["brand"], float(value["price"]))
+
+
+def string_to_component(component_str: str):
+    """
+    Convert a string representation of a component back to a Component object.
+    Format: ClassName(name, brand, price)
+
+    The price and brand are taken from the end of the string, so a comma or bracket in
+    the name doesn't break parsing.
+    """
+
+    if not component_str:
+        print("No component string provided.")
+        return None
+
+    try:
+        component_type, attrs = component_str.split('(', 1)
+        if not attrs.endswith(')'):
+            raise ValueError(f"Missing closing bracket: {component_str}")
+        attrs = attrs[:-1].rsplit(',', 2)
+
+        # Check if we have the right number of attributes
+        if len(attrs) != 3:
+            raise ValueError(f"Incorrect number of attributes for {component_type}: {component_str}")
+
+        component_class = COMPONENT_TYPES.get(component_type.strip())
+        if component_class is None:
+            raise ValueError(f"Unknown component type: {component_type} in {component_str}")
+
+        name = attrs[0].strip()
+        brand = attrs[1].strip()
+        price = float(attrs[2].strip())
+        return component_class(name, brand, price)
+
+    except Exception as e:
+        print(f"Error parsing component string '{component_str}': {e}")
+        return None
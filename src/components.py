@@ -0,0 +1,83 @@
+"""
+The PC components a build is made of.
+"""
+
+import sys
+import weakref
+
+# Every Component subclass by class name, filled in as the classes are defined
+COMPONENT_TYPES = {}
+
+# Components handed out by Component.shared, dropped again once no build uses them
+_shared_components = weakref.WeakValueDictionary()
+
+
+class Component:
+    """
+    Base class for a PC component with only name, brand, and price.
+
+    Components use __slots__ and interned strings because the same parts turn up in many
+    builds. Component.shared goes further and returns one object per distinct part.
+    """
+    __slots__ = ("name", "brand", "price", "__weakref__")
+
+    def __init__(self, name: str, brand: str, price: float):
+        self.name = sys.intern(name) if isinstance(name, str) else name
+        self.brand = sys.intern(brand) if isinstance(brand, str) else brand
+        self.price = price
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        COMPONENT_TYPES[cls.__name__] = cls
+
+    @classmethod
+    def shared(cls, name, brand, price):
+        """
+        Return a component shared with every other build that has the same part.
+        Shared components must not be modified, create a new one instead.
+        """
+        key = (cls, name, brand, price)
+        component = _shared_components.get(key)
+        if component is None:
+            component = cls(name, brand, price)
+            _shared_components[key] = component
+        return component
+
+    def __str__(self):
+        return f"{self.__class__.__name__}({self.name}, {self.brand}, {self.price})"
+
+
+class CPU(Component):
+    __slots__ = ()
+
+
+class GPU(Component):
+    __slots__ = ()
+
+
+class RAM(Component):
+    __slots__ = ()
+
+
+class SSD(Component):
+    __slots__ = ()
+
+
+class HardDrive(Component):
+    __slots__ = ()
+
+
+class NVMe(Component):
+    __slots__ = ()
+
+
+class PSU(Component):
+    __slots__ = ()
+
+
+class Case(Component):
+    __slots__ = ()
+
+
+class Motherboard(Component):
+    __slots__ = ()
@@ -4,76 +4,34 @@ from tkinter import messagebox, Entry, Label, Canvas, PhotoImage, END
 from enum import Enum
 from image_uploader import *
 from PIL import Image, ImageTk
-from image_uploader import open_image_uploader, resize_image
+from image_uploader import open_image_uploader
+from storage import get_storage
+from image_loader import ImageLoader
+from image_variants import get_variant_image
+from photo_cache import PhotoImageCache
+from scroll_prefetcher import ScrollPrefetcher
+from sku_allocator import SkuRangeExhaustedError
+from build_form import BuildForm
+from render_scheduler import RenderScheduler
 
 import os
 import json
 import random
 
-def get_builds_list():
-    file_path = os.path.join('..', 'data', 'Builds.json')
-    # Open and load the JSON file
-    with open(file_path, 'r') as file:
-        data = json.load(file)
+# Every row of the build list is this tall, it fits the photo and the description
+BUILD_ROW_HEIGHT = 460
+# Rows kept filled in above and below the visible part of a virtual list
+VIRTUAL_LIST_OVERSCAN = 2
 
-    # Access the list of builds
-    builds = data['builds']
-    return builds
+def get_builds_list():
+    return get_storage().get_builds_list()
 
 def clean_unused_skus():
-    builds = get_builds_list()
-    file_path = os.path.join('..', 'data', 'SKUS.json')
-
-    # Open and load the JSON file
-    with open(file_path, 'r') as file:
-        data = json.load(file)
-
-    # Access the list of SKUs
-    skus = data['SKUS']
-    used_skus = set()  # Use a set for faster lookups
-
-    # Collect all used SKUs
-    for build in builds:
-        print(build["sku"])
-        for sku in skus:
-            print(sku)
-            if str(build["sku"]) == str(sku):
-                used_skus.add(sku)
-
-    # Filter the SKUs to keep only the used ones
-    cleaned_skus = [sku for sku in skus if sku in used_skus]
-
-    # Update the JSON data
-    data['SKUS'] = cleaned_skus
-
-    # Write back the cleaned data to the JSON file
-    with open(file_path, 'w') as file:
-        json.dump(data, file, indent=4)
-
-    print("Unused SKUs have been cleared from SKUS.json.")
+    get_storage().clean_unused_skus()
+    print("Unused SKUs have been cleared.")
 
 def generate_unique_sku():
-    file_path = os.path.join('..', 'data', 'SKUS.json')
-    # Open and load the JSON file
-    with open(file_path, 'r') as file:
-        data = json.load(file)
-
-    # Access the list of used SKUs
-    used_skus = data['SKUS']
-
-    # Generate a unique random SKU that isn't already used
-    new_sku = random.randint(1000, 10000)
-
-    # Check if the SKU is already used and keep generating until a unique one is found
-    while new_sku in used_skus:
-        new_sku = random.randint(1000, 10000)
-
-    # Save the updated SKU list back to the JSON file
-    used_skus.append(new_sku)
-    with open(file_path, 'w') as file:
-        json.dump(data, file, indent=4)
-
-    return new_sku
+    return get_storage().generate_unique_sku()
 
 class ScrollableFrame(tkinter.Frame):
     def __init__(self, master):
@@ -120,23 +78,208 @@ class ScrollableFrame(tkinter.Frame):
         """Show the scrollable frame."""
         self.pack(side="left", fill="both", expand=True)
 
+class VirtualScrollableFrame(tkinter.Frame):
+    """
+    A scrollable list that only has widgets for the rows that are on screen.
+
+    Every row is the same height, so the scroll region comes from the number of items instead
+    of laying out a widget for each one. A small pool of rows is moved around the canvas as it
+    scrolls and filled in with whichever items are in view, plus a few either side.
+    """
+    def __init__(self, master, row_height, make_row, bind_row, unbind_row=None, key=id,
+                 on_view_changed=None, overscan=VIRTUAL_LIST_OVERSCAN):
+        """
+        :param row_height: Height of every row in pixels.
+        :param make_row: Function (parent) -> row, where row.frame is the widget holding the row.
+        :param bind_row: Function (row, item) that fills a row in with an item.
+        :param unbind_row: Function (row) called when a row scrolls out of view, e.g. to drop its image.
+        :param key: Function (item) -> key that identifies an item between calls to set_items.
+        :param on_view_changed: Function (position, first, last, items) called whenever the view
+                                moves, where position is the row at the top of the view with the
+                                fraction scrolled past it, and first to last the rows in view.
+        :param overscan: How many rows either side of the visible ones to keep filled in.
+        """
+        super().__init__(master)
+        self.row_height = row_height
+        self.make_row = make_row
+        self.bind_row = bind_row
+        self.unbind_row = unbind_row
+        self.key = key
+        self.on_view_changed = on_view_changed
+        self.overscan = overscan
+
+        self.items = []
+        self._active_rows = {}  # item index -> row showing it
+        self._spare_rows = []
+
+        # Create a canvas and a scrollbar
+        self.canvas = tkinter.Canvas(self, bg=master["bg"])
+        self.scrollbar = tkinter.Scrollbar(self, orient="vertical", command=self.canvas.yview)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True)
+
+        # Any change to the view, scrolling or resizing, goes through on_scroll
+        self.canvas.configure(yscrollcommand=self.on_scroll)
+        self.canvas.bind("<Configure>", lambda event: self.refresh())
+
+        # Prevent the canvas from resizing to fit the frame
+        self.canvas.pack_propagate(False)
+        self.pack_propagate(False)
+
+    def on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self.refresh()
+
+    def set_items(self, items, keep_position=False):
+        """
+        Show a new list of items, scrolling back to the top unless keep_position is set.
+
+        Rows are matched to the new items by key. A row whose item is still in view is only
+        moved, and only filled in again if the item with its key is a different object.
+        """
+        previous_rows = {self.key(row.item): row for row in self._active_rows.values()}
+        self._active_rows = {}
+        self.items = items
+
+        self.update_scroll_region()
+        if not keep_position:
+            self.canvas.yview_moveto(0)
+        self.refresh(previous_rows)
+
+        # Rows whose items have gone, or are no longer in view
+        for row in previous_rows.values():
+            self._recycle(row)
+
+    def items_changed(self):
+        """Call after appending to the items list, rows that are already filled in are kept."""
+        self.update_scroll_region()
+        self.refresh()
+
+    def update_scroll_region(self):
+        self.canvas.configure(scrollregion=(0, 0, self.canvas.winfo_width(), len(self.items) * self.row_height))
+
+    def refresh(self, previous_rows=None):
+        """
+        Fill in the rows that are in view and recycle the ones that have scrolled out of it.
+
+        :param previous_rows: {key: row} of rows from before set_items that can be reused.
+        """
+        top = self.canvas.canvasy(0)
+        height = max(self.canvas.winfo_height(), self.row_height)
+        first_visible = int(top // self.row_height)
+        last_visible = min(len(self.items), int((top + height) // self.row_height) + 1)
+        first = max(0, first_visible - self.overscan)
+        last = min(len(self.items), last_visible + self.overscan)
+
+        for index in [index for index in self._active_rows if not first <= index < last]:
+            self._hide_row(index)
+        for index in range(first, last):
+            if index not in self._active_rows:
+                self._show_row(index, previous_rows)
+
+        if self.on_view_changed is not None and self.items:
+            self.on_view_changed(top / self.row_height, first_visible, last_visible, self.items)
+
+    def _show_row(self, index, previous_rows=None):
+        item = self.items[index]
+        row = previous_rows.pop(self.key(item), None) if previous_rows else None
+        if row is None and self._spare_rows:
+            row = self._spare_rows.pop()
+        elif row is None:
+            row = self.make_row(self.canvas)
+            row.item = None
+            row.window_id = self.canvas.create_window(0, 0, window=row.frame, anchor="nw", height=self.row_height)
+
+        self.canvas.coords(row.window_id, 0, index * self.row_height)
+        self.canvas.itemconfigure(row.window_id, state="normal")
+        self._active_rows[index] = row
+        if row.item is not item:
+            row.item = item
+            self.bind_row(row, item)
+
+    def _hide_row(self, index):
+        self._recycle(self._active_rows.pop(index))
+
+    def _recycle(self, row):
+        self.canvas.itemconfigure(row.window_id, state="hidden")
+        if self.unbind_row is not None:
+            self.unbind_row(row)
+        row.item = None
+        self._spare_rows.append(row)
+
+    def visible_items(self):
+        """The items that currently have a row, in list order."""
+        return [self.items[index] for index in sorted(self._active_rows)]
+
+    def clear(self):
+        self.set_items([])
+
+    def hide(self):
+        """Hide the scrollable frame."""
+        self.pack_forget()
+
+    def show(self):
+        """Show the scrollable frame."""
+        self.pack(side="left", fill="both", expand=True)
+
+class BuildRow:
+    """The widgets for one row of the build list, reused for whichever build is scrolled into it."""
+    def __init__(self, parent):
+        # The PCBuildUI shown in the row, set by VirtualScrollableFrame
+        self.item = None
+        self.image_future = None
+        # Key of the photo the row holds in the GUI's photo cache
+        self.photo_key = None
+        self.window_id = None
+
+        self.frame = tkinter.Frame(parent, bg=parent["bg"])
+
+        self.build_image = Canvas(self.frame, width=350, height=300, bg="lightgrey")
+        self.build_image.create_text(175, 150, text="Loading image...", tags="placeholder")
+        self.build_image.grid(column=0, row=0)
+
+        self.update_build_button = tkinter.Button(self.frame, bg="lightblue", width=4, height=2,
+                                                  font=("Arial", 10), borderwidth=0,
+                                                  highlightbackground="white")
+        self.update_build_button.grid(column=1, row=0, padx=(5, 0))
+
+        self.description_label = tkinter.Label(
+            self.frame, bg='lightblue',
+            font=("Arial", 13),
+            fg="white",
+            anchor="w",  # Align text to the left
+            justify="left",  # Left-align multi-line text
+            padx=10,  # Add padding on the x-axis
+            pady=10,  # Add padding on the y-axis
+            wraplength=200
+        )
+        self.description_label.grid(column=2, row=0, pady=(25, 0), sticky="n")
+
+    def show_placeholder(self):
+        self.build_image.delete("photo")
+        self.build_image.itemconfigure("placeholder", state="normal")
+        self.build_image.image = None
+
+    def show_photo(self, photo):
+        self.build_image.itemconfigure("placeholder", state="hidden")
+        self.build_image.delete("photo")
+        self.build_image.create_image(175, 150, image=photo, tags="photo")
+        self.build_image.image = photo  # Keep a reference to avoid garbage collection
+
 class PCBuildUI:
-    def __init__(self, pc_dict, full_pc_dict, sku):
-        self.description_label = None
+    """A build in the build list. Widgets only exist for it while it is scrolled into a BuildRow."""
+    def __init__(self, pc_dict, full_pc_dict, sku, record=None):
         self.packed = False
+        # The stored record the build was made from, to tell if it has changed since
+        self.record = dict(record) if record is not None else full_pc_dict
         self.full_pc_dict = full_pc_dict
         self.pc_dict = pc_dict
-        self.build_sku_label = None
-        self.update_build_button = tkinter.Button(text=f"Edit ({sku})", bg="lightblue", width=4, height=2,
-                                                                    font=("Arial", 10), borderwidth=0,
-                                                                    highlightbackground="white")
         self.sku = sku
-
+        # Called when the build's edit button is pressed
+        self.on_edit = None
 
         self.pc_str = ""
 
-        self.build_image = None
-
         counter = 0
 
         for key, value in pc_dict.items():
@@ -161,12 +304,6 @@ class PCBuildUI:
     def get_sku(self):
         return self.pc_dict["sku"]
 
-    def destroy(self):
-        if self.description_label is not None:
-            self.description_label.grid_forget()
-            self.build_sku_label.grid_forget()
-        del self
-
 class Scene(Enum):
     START_SCENE = 1
     ADD_BUILD_SCENE = 2
@@ -196,10 +333,6 @@ class ComponentEntry:
     def clear(self):
         self.entry.delete(0, tkinter.END)  # Clear the entry
 
-    def clear_title(self):
-        self.label.grid_forget()
-        self.label.destroy()
-
 class GUI:
     """
     TODO - IMPLEMENT ADDING A BUILD AND REMOVING A BUILD
@@ -207,14 +340,24 @@ class GUI:
     """
     def __init__(self):
         self.update_build_buttons = []
+        self.photos_shown = 0
+        self.photo_loads_pending = 0
+        self.photo_load_start = 0
+        # Every build made so far keyed by SKU, so unchanged builds are reused between renders
+        self.builds_by_sku = {}
+        self.next_builds = []
+        self.make_build = None
         self.has_image = False
         self.edit_build_frame = None
         self.new_sku_label = None
         self.new_build_sku = None
+        # Stored image of the build being added or edited, None until one is uploaded
+        self.new_build_image_file_name = None
         self.tk_image = None
         self.upload_btn = None
         self.display_label = None
         self.image_upload_frame = None
+        self.add_build_scene_built = False
         self.scene = "START_SCENE"
 
         # Create main window
@@ -225,6 +368,15 @@ class GUI:
         self.window.geometry("1300x900")  # Set the initial size of the window
         self.window.configure(bg="black")
 
+        # Decodes build images off the Tk thread
+        self.image_loader = ImageLoader(self.window)
+        # Build photos that have been shown, kept within a byte budget
+        self.photo_cache = PhotoImageCache()
+        # Warms the photos of builds about to be scrolled to
+        self.prefetcher = ScrollPrefetcher(self.image_loader, self.build_image_path, "list")
+        # Adds builds to the build list a few at a time between frames
+        self.render_scheduler = RenderScheduler(self.window)
+
         # Create title grid frame
         self.title_grid_frame = tkinter.Frame(self.window, bg="black")
         self.title_grid_frame.pack()
@@ -241,8 +393,11 @@ class GUI:
         self.build_grid_frame.pack_propagate(False)  # Prevent resizing to fit contents
         self.build_grid_frame.pack(fill="x")  # Fill horizontally but fixed width
 
-        # Create scrollable frame within the build frame
-        self.build_scrollable_frame = ScrollableFrame(self.build_grid_frame)
+        # Create scrollable frame within the build frame, only builds in view get widgets
+        self.build_scrollable_frame = VirtualScrollableFrame(self.build_grid_frame, BUILD_ROW_HEIGHT, BuildRow,
+                                                             self.bind_build_row, self.unbind_build_row,
+                                                             key=lambda build: build.sku,
+                                                             on_view_changed=self.prefetcher.on_view_changed)
         self.build_scrollable_frame.pack(fill="both", expand=True)
 
         # Create add build grid frame with fixed width and allow height expansion
@@ -276,6 +431,9 @@ class GUI:
 
         self.extras_label = None
 
+        # Every field of the add/edit form by (slot, field)
+        self.build_form = BuildForm()
+
         # Lists to store all the Entry Components
         self.cpu_components = []
         self.gpu_components = []
@@ -399,6 +557,8 @@ class GUI:
             component.entry.grid(column=len(self.cpu_components)+1, row=2, sticky="ew")
 
         self.cpu_components.append(component)  # Store the component for later use
+        if not title:
+            self.build_form.bind("cpu", text.lower(), component)
 
     # Similar methods for GPU, RAM, Motherboard, etc.
     def add_gpu_component(self, text, font=("Arial", 12, "bold"), title=False):
@@ -411,6 +571,8 @@ class GUI:
             component.entry.grid(column=len(self.gpu_components) + 1, row=4, sticky="ew")
 
         self.gpu_components.append(component)
+        if not title:
+            self.build_form.bind("gpu", text.lower(), component)
 
     def add_ram_component(self, text, font=("Arial", 12, "bold"), title=False):
         component = ComponentEntry(self.add_build_scrollable_frame.scrollable_frame, text, font, is_title=title)
@@ -422,6 +584,8 @@ class GUI:
             component.entry.grid(column=len(self.ram_components) + 1, row=6, sticky="ew")
 
         self.ram_components.append(component)
+        if not title:
+            self.build_form.bind("ram", text.lower(), component)
 
     def add_motherboard_component(self, text, font=("Arial", 12, "bold"), title=False):
         component = ComponentEntry(self.add_build_scrollable_frame.scrollable_frame, text, font, is_title=title,)
@@ -435,6 +599,8 @@ class GUI:
             component.entry.grid(column=len(self.motherboard_components) + 1, row=8, sticky="ew")
 
         self.motherboard_components.append(component)
+        if not title:
+            self.build_form.bind("motherboard", text.lower(), component)
 
     def add_ssd_component(self, text, font=("Arial", 12, "bold"), title=False, is_checkbox=False):
         component = ComponentEntry(self.add_build_scrollable_frame.scrollable_frame, text, font, is_title=title, is_checkbox=is_checkbox)
@@ -448,6 +614,8 @@ class GUI:
             component.entry.grid(column=len(self.ssd_components) + 1, row=10, sticky="ew")
 
         self.ssd_components.append(component)
+        if not title:
+            self.build_form.bind("ssd", text.lower(), component)
 
     def add_hdd_component(self, text, font=("Arial", 12, "bold"), title=False, is_checkbox=False):
         component = ComponentEntry(self.add_build_scrollable_frame.scrollable_frame, text, font, is_title=title, is_checkbox=is_checkbox)
@@ -461,6 +629,8 @@ class GUI:
             component.entry.grid(column=len(self.hdd_components) + 1, row=12, sticky="ew")
 
         self.hdd_components.append(component)
+        if not title:
+            self.build_form.bind("hdd", text.lower(), component)
 
     def add_nvme_component(self, text, font=("Arial", 12, "bold"), title=False, is_checkbox=False):
         component = ComponentEntry(self.add_build_scrollable_frame.scrollable_frame, text, font, is_title=title, is_checkbox=is_checkbox)
@@ -474,6 +644,8 @@ class GUI:
             component.entry.grid(column=len(self.nvme_components) + 1, row=14, sticky="ew")
 
         self.nvme_components.append(component)
+        if not title:
+            self.build_form.bind("nvme", text.lower(), component)
 
     def add_psu_component(self, text, font=("Arial", 12, "bold"), title=False):
         component = ComponentEntry(self.add_build_scrollable_frame.scrollable_frame, text, font, is_title=title)
@@ -485,6 +657,8 @@ class GUI:
             component.entry.grid(column=len(self.psu_components) + 1, row=16, sticky="ew")
 
         self.psu_components.append(component)
+        if not title:
+            self.build_form.bind("psu", text.lower(), component)
 
     def add_case_component(self, text, font=("Arial", 12, "bold"), title=False):
         component = ComponentEntry(self.add_build_scrollable_frame.scrollable_frame, text, font, is_title=title)
@@ -496,210 +670,8 @@ class GUI:
             component.entry.grid(column=len(self.case_components) + 1, row=18, sticky="ew")
 
         self.case_components.append(component)
-
-    def clear_cpu_components(self):
-        if self.cpu_components is None:
-            return
-
-        """Clear CPU component entries and labels."""
-        for component in self.cpu_components:
-            if not component.is_title:
-                component.label.destroy()
-                component.entry.destroy()
-            else:
-                component.clear_title()
-        self.cpu_components.clear()
-
-    def clear_gpu_components(self):
-        if self.gpu_components is None:
-            return
-
-        """Clear GPU component entries and labels."""
-        for component in self.gpu_components:
-            if not component.is_title:
-                component.label.destroy()
-                component.entry.destroy()
-            else:
-                component.clear_title()
-        self.gpu_components.clear()
-
-    def clear_ram_components(self):
-        if self.ram_components is None:
-            return
-
-        """Clear RAM component entries and labels."""
-        for component in self.ram_components:
-            if not component.is_title:
-                component.label.destroy()
-                component.entry.destroy()
-            else:
-                component.clear_title()
-        self.ram_components.clear()
-
-    def clear_motherboard_components(self):
-        if self.motherboard_components is None:
-            return
-
-        """Clear Motherboard component entries and labels."""
-        for component in self.motherboard_components:
-            if not component.is_title:
-                component.label.destroy()
-                component.entry.destroy()
-            else:
-                component.clear_title()
-        self.motherboard_components.clear()
-
-    def clear_ssd_components(self):
-        if self.ssd_components is None:
-            return
-
-        """Clear SSD component entries and labels."""
-        for component in self.ssd_components:
-            if not component.is_title:
-                component.label.destroy()
-                component.entry.destroy()
-            else:
-                component.clear_title()
-        self.ssd_components.clear()
-
-    def clear_hdd_components(self):
-        if self.hdd_components is None:
-            return
-
-        """Clear HDD component entries and labels."""
-        for component in self.hdd_components:
-            if not component.is_title:
-                component.label.destroy()
-                component.entry.destroy()
-            else:
-                component.clear_title()
-        self.hdd_components.clear()
-
-    def clear_nvme_components(self):
-        if self.nvme_components is None:
-            return
-
-        """Clear NVME component entries and labels."""
-        for component in self.nvme_components:
-            if not component.is_title:
-                component.label.destroy()
-                component.entry.destroy()
-            else:
-                component.clear_title()
-        self.nvme_components.clear()
-
-    def clear_psu_components(self):
-        if self.psu_components is None:
-            return
-
-        """Clear PSU component entries and labels."""
-        for component in self.psu_components:
-            if not component.is_title:
-                component.label.destroy()
-                component.entry.destroy()
-            else:
-                component.clear_title()
-        self.psu_components.clear()
-
-    def clear_case_components(self):
-        if self.case_components is None:
-            return
-
-        """Clear Case component entries and labels."""
-        for component in self.case_components:
-            if not component.is_title:
-                component.label.destroy()
-                component.entry.destroy()
-            else:
-                component.clear_title()
-        self.case_components.clear()
-
-    def clear_extra_costs_components(self):
-        if self.extra_costs_components is None:
-            return
-        if hasattr(self, 'extra_costs_components'):
-            self.extra_costs_components.label.destroy()
-            self.extra_costs_components.entry.destroy()
-
-    def clear_target_sell_price(self):
-        """Clear Target Sell Price component entries and labels."""
-        if self.target_sell_price_component is None:
-            return
-        if hasattr(self, 'target_sell_price_component'):
-            self.target_sell_price_component.label.destroy()
-            self.target_sell_price_component.entry.destroy()
-
-    def clear_extra_profit(self):
-        if self.extra_profit_component is None:
-            return
-
-        """Clear Extra Profit component entries and labels."""
-        if hasattr(self, 'extra_profit_component'):
-            self.extra_profit_component.label.destroy()
-            self.extra_profit_component.entry.destroy()
-
-    def clear_list_date(self):
-        if self.list_date_component is None:
-            return
-
-        """Clear List Date component entries and labels."""
-        if hasattr(self, 'list_date_component'):
-            self.list_date_component.label.destroy()
-            self.list_date_component.entry.destroy()
-
-    def clear_sell_date(self):
-        if self.sell_date_component is None:
-            return
-
-        """Clear Sell Date component entries and labels."""
-        if hasattr(self, 'sell_date_component'):
-            self.sell_date_component.label.destroy()
-            self.sell_date_component.entry.destroy()
-
-    def clear_sell_price(self):
-        if self.sell_price_component is None:
-            return
-
-        """Clear Sell Price component entries and labels."""
-        if hasattr(self, 'sell_price_component'):
-            self.sell_price_component.label.destroy()
-            self.sell_price_component.entry.destroy()
-
-    def clear_all_components(self):
-        """Call clear methods for all components."""
-        self.cpu_components = []
-        self.gpu_components = []
-        self.ram_components = []
-        self.motherboard_components = []
-        self.ssd_components = []
-        self.nvme_components = []
-        self.hdd_components = []
-        self.psu_components = []
-        self.case_components = []
-        self.extra_costs_components = None
-        self.target_sell_price_component = None
-        self.extra_profit_component = None
-        self.list_date_component = None
-        self.sell_date_component = None
-        self.sell_price_component = None
-        """
-        self.clear_cpu_components()
-        self.clear_gpu_components()
-        self.clear_ram_components()
-        self.clear_motherboard_components()
-        self.clear_ssd_components()
-        self.clear_hdd_components()
-        self.clear_nvme_components()
-        self.clear_psu_components()
-        self.clear_case_components()
-        self.clear_extra_costs_components()
-        self.clear_target_sell_price()
-        self.clear_extra_profit()
-        self.clear_list_date()
-        self.clear_sell_date()
-        self.clear_sell_price()
-        self.clear_extra_costs_components()
-        """
+        if not title:
+            self.build_form.bind("case", text.lower(), component)
 
     # Specific methods for other extra fields
     def add_target_sell_price(self):
@@ -707,6 +679,7 @@ class GUI:
         self.extras_label.grid(column=1, row=27, pady=10, padx=(0, 5), sticky="w")
 
         self.target_sell_price_component = ComponentEntry(self.add_build_scrollable_frame.scrollable_frame, "Target Sell Price")
+        self.build_form.bind("extras", "target_sell_price", self.target_sell_price_component)
         self.target_sell_price_component.label.grid(column=2, row=27, sticky="ew")
         self.target_sell_price_component.entry.grid(column=2, row=28, sticky="ew")
 
@@ -714,28 +687,33 @@ class GUI:
 
     def add_extra_profit(self):
         self.extra_profit_component = ComponentEntry(self.add_build_scrollable_frame.scrollable_frame, "Extra Profit")
+        self.build_form.bind("extras", "extra_profit", self.extra_profit_component)
         self.extra_profit_component.label.grid(column=3, row=27, sticky="ew")
         self.extra_profit_component.entry.grid(column=3, row=28, sticky="ew")
         self.extra_profit_component.entry.insert(0, "0.00")
 
     def add_list_date(self):
         self.list_date_component = ComponentEntry(self.add_build_scrollable_frame.scrollable_frame, "List Date")
+        self.build_form.bind("extras", "list_date", self.list_date_component)
         self.list_date_component.label.grid(column=4, row=27,sticky="ew")
         self.list_date_component.entry.grid(column=4, row=28, sticky="ew")
 
     def add_sell_date(self):
         self.sell_date_component = ComponentEntry(self.add_build_scrollable_frame.scrollable_frame, "Sell Date")
+        self.build_form.bind("extras", "sell_date", self.sell_date_component)
         self.sell_date_component.label.grid(column=2, row=29,sticky="ew")
         self.sell_date_component.entry.grid(column=2, row=30,sticky="ew")
 
     def add_sell_price(self):
         self.sell_price_component = ComponentEntry(self.add_build_scrollable_frame.scrollable_frame, "Sell Price")
+        self.build_form.bind("extras", "sell_price", self.sell_price_component)
         self.sell_price_component.label.grid(column=3, row=29,sticky="ew")
         self.sell_price_component.entry.grid(column=3, row=30,sticky="ew")
         self.sell_price_component.entry.insert(0, "0.00")
 
     def add_extra_costs(self):
         self.extra_costs_components = ComponentEntry(self.add_build_scrollable_frame.scrollable_frame, "Extra Costs")
+        self.build_form.bind("extras", "extra_costs", self.extra_costs_components)
         self.extra_costs_components.label.grid(column=4, row=29, sticky="ew")
         self.extra_costs_components.entry.grid(column=4, row=30, sticky="ew")
         self.extra_costs_components.entry.insert(0, "0.00")
@@ -765,51 +743,47 @@ class GUI:
         for entry in self.all_entries:
             entry.grid_forget()
         self.navigation_grid_frame.grid_forget()
-        self.clear_visible_builds()
-        self.window.update()
+        # The build list is kept while it's hidden, only a render still in progress stops
+        self.render_scheduler.cancel()
 
     def change_scene(self, scene):
+        """
+        Switch to a scene. Each scene's widgets are made the first time it is shown and then
+        kept, switching only hides and shows them and resets the form.
+        """
         self.clear_scene()
-        self.build_scrollable_frame.clear()
-        self.add_build_scrollable_frame.clear()
-        self.clear_all_components()
 
         match scene:
             case Scene.START_SCENE:
+                # Leaving the add build scene gives back the SKU of a new build that was never
+                # saved, this doesn't touch the disk
+                get_storage().release_sku_leases()
                 self.add_build_button.grid(in_=self.navigation_grid_frame, column=0, row=1)
                 self.show_all_button.grid(in_=self.navigation_grid_frame, column=1, row=1)
+                if self.make_build is not None:
+                    # Builds have been shown before, bring them up to date, only changed ones are remade
+                    self.render_builds(get_builds_list(), self.make_build)
             case Scene.ADD_BUILD_SCENE:
                 self.add_build_scrollable_frame.show()
                 self.go_back_to_start_scene_button.grid(in_=self.navigation_grid_frame, column=1, row=1, pady=5)
                 self.save_build_button.grid(in_=self.navigation_grid_frame, column=2, row=1, pady=5)
 
-                # Layout CPU Entries and Labels
-                self.add_all_entry_components()
-                self.all_extra_components = [self.extra_costs_components, self.target_sell_price_component,
-                                             self.extra_profit_component, self.list_date_component,
-                                             self.sell_date_component, self.sell_price_component]
-
-                self.all_components = (
-                            self.cpu_components + self.gpu_components + self.ram_components + self.motherboard_components + self.ssd_components +
-                            self.nvme_components + self.hdd_components + self.psu_components + self.case_components + self.all_extra_components)
-                print(self.all_components)
-
-        clean_unused_skus()
-
-
-    def go_to_start_scene(self):
-        self.hide_add_build_grid_frame()
-        self.show_build_grid_frame()
-        self.change_scene(Scene.START_SCENE)
-        self.build_scrollable_frame.show()
+                if not self.add_build_scene_built:
+                    self.build_add_build_scene()
+                self.reset_add_build_scene()
 
-    def go_to_add_build_scene(self):
-        self.hide_build_grid_frame()
-        self.show_add_build_grid_frame()
-        self.change_scene(Scene.ADD_BUILD_SCENE)
-        self.add_build_scrollable_frame.show()
+    def build_add_build_scene(self):
+        """Make every widget of the add build scene, this only happens once."""
+        # Layout CPU Entries and Labels
+        self.add_all_entry_components()
+        self.all_extra_components = [self.extra_costs_components, self.target_sell_price_component,
+                                     self.extra_profit_component, self.list_date_component,
+                                     self.sell_date_component, self.sell_price_component]
 
-        self.new_build_sku = generate_unique_sku()
+        self.all_components = (
+                    self.cpu_components + self.gpu_components + self.ram_components + self.motherboard_components + self.ssd_components +
+                    self.nvme_components + self.hdd_components + self.psu_components + self.case_components + self.all_extra_components)
+        print(self.all_components)
 
         self.image_upload_frame = tkinter.Frame(self.add_build_scrollable_frame, bg="lightblue", width=500, height=500)
         self.image_upload_frame.grid(column=2, row=0, pady=20, sticky="nsew", padx=(0, 50))
@@ -836,13 +810,48 @@ class GUI:
         )
         self.upload_btn.grid(row=1, column=0, pady=10, sticky="ew")
 
-        self.new_sku_label = tk.Label(self.image_upload_frame, text=f"Builds SKU: {self.new_build_sku}", bg="lightblue", font=("Arial", 16, "bold"))
+        self.new_sku_label = tk.Label(self.image_upload_frame, bg="lightblue", font=("Arial", 16, "bold"))
         self.new_sku_label.grid(row=2, column=0, stick="ew")
 
-        for component in self.all_components:
-            if component is not None and component.label is not None:
-                if component.label.cget("text") == "Price":
-                    component.entry.insert(0, "0.00")
+        self.add_build_scene_built = True
+
+    def reset_add_build_scene(self):
+        """Put the add build scene back to how it looks for a new build."""
+        self.build_form.reset()
+        self.tk_image = None
+        self.display_label.configure(image="", text="No Image Uploaded", width=40, height=15)
+        self.display_label.image = None
+        self.add_build_scrollable_frame.canvas.yview_moveto(0)
+
+    def go_to_start_scene(self):
+        self.hide_add_build_grid_frame()
+        self.show_build_grid_frame()
+        self.change_scene(Scene.START_SCENE)
+        self.build_scrollable_frame.show()
+
+    def show_add_build_scene(self):
+        """Switch to the add build scene with an empty form, without leasing a SKU."""
+        self.hide_build_grid_frame()
+        self.show_add_build_grid_frame()
+        self.change_scene(Scene.ADD_BUILD_SCENE)
+        self.add_build_scrollable_frame.show()
+
+        self.new_build_image_file_name = None
+        self.has_image = True
+
+    def go_to_add_build_scene(self):
+        """Lease a SKU for a new build and show the add build scene for it."""
+        # Leases are only released when going back to the start scene, so the SKU is still
+        # leased when the build is saved and gets recorded as used
+        try:
+            new_build_sku = generate_unique_sku()
+        except SkuRangeExhaustedError as e:
+            messagebox.showerror("SKU Range Exhausted", f"Unable to add a build, the SKU range is exhausted. {e}")
+            return
+
+        self.show_add_build_scene()
+        self.new_build_sku = new_build_sku
+        self.new_sku_label.config(text=f"Builds SKU: {self.new_build_sku}")
 
     @staticmethod
     def show_message_has_no_image():
@@ -860,10 +869,8 @@ class GUI:
 
         :param image_path: The file path of the uploaded image.
         """
-        img = Image.open(image_path)
-
-        # Resize the image to the desired size (300x250)
-        img = img.resize((300, 250), Image.Resampling.LANCZOS)
+        # Load the pre-sized 300x250 variant made when the image was uploaded
+        img = get_variant_image(image_path, "display")
 
         self.tk_image = ImageTk.PhotoImage(img)
 
@@ -875,156 +882,169 @@ class GUI:
         # Make sure the label is large enough to display the image
         self.display_label.config(width=300, height=250)
 
+        self.new_build_image_file_name = os.path.basename(image_path)
         self.has_image = True
 
     def on_closing(self):
         if messagebox.askokcancel("Quit", "Do you want to quit?"):
             clean_unused_skus()
+            # Make sure the background writer has saved everything before quitting
+            get_storage().flush()
+            self.render_scheduler.cancel()
+            self.image_loader.shutdown()
             self.window.destroy()
 
-    def update_labels(self):
-        total_builds = len(self.visible_builds)
-        for i in range(total_builds):
-            self.visible_builds[i].update_build_button.grid(in_=self.build_scrollable_frame.scrollable_frame, column=1, row=i, padx=(5, 0))
-            self.visible_builds[i].description_label = tkinter.Label(
-                self.build_scrollable_frame.scrollable_frame, text=self.visible_builds[i].pc_str, bg='lightblue',
-                font=("Arial", 13),
-                fg="white",
-                anchor="w",  # Align text to the left
-                justify="left",  # Left-align multi-line text
-                padx=10,  # Add padding on the x-axis
-                pady=10,  # Add padding on the y-axis
-                wraplength=200
-            )
-            self.visible_builds[i].description_label.grid(in_=self.build_scrollable_frame.scrollable_frame, column=2, row=i, pady=(25,0))
-
-    def update_photos(self):
-        total_builds = len(self.visible_builds)
-        for i in range(total_builds):
-            image_file_path = self.visible_builds[i].full_pc_dict["image_file_name"]
-            self.visible_builds[i].build_image = Canvas(width=350, height=300)
-            build_img = resize_image(image_path=f"../images/{image_file_path}", width=350, height=300)
-            self.visible_builds[i].build_image.create_image(175, 150, image=build_img)
-            self.visible_builds[i].build_image.grid(in_=self.build_scrollable_frame.scrollable_frame, column = 0, row=i)
-            self.visible_builds[i].build_image.image = build_img
-
-    def add_pc_build(self, pc_dict, full_pc_dict, sku, pc_build):
-        print(self.visible_builds)
-        new_build = PCBuildUI(pc_dict, full_pc_dict, sku)
-        new_build.update_build_button.config(command=lambda: self.on_update_build(sku, pc_build))
-        self.visible_builds.append(new_build)
+    def show_visible_builds(self):
+        """Show visible_builds in the build list, rows that already show one of them are kept."""
+        self.build_scrollable_frame.set_items(self.visible_builds, keep_position=True)
+
+    def render_builds(self, records, make_build):
+        """
+        Bring the build list up to date with the stored build records, in time-sliced batches.
+
+        Builds are keyed by SKU. A record that hasn't changed since the last render keeps its
+        PCBuildUI and its row, only new or changed records go through make_build(record), and
+        builds that are no longer stored are dropped.
+
+        :param make_build: Function (record) -> PCBuildUI from add_pc_build, or None on error.
+        """
+        self.render_scheduler.cancel()
+        self.make_build = make_build
+        self.next_builds = []
+        self.photo_load_start = time.perf_counter()
+        self.photos_shown = 0
+
+        # With nothing on screen yet builds are shown as they are made, otherwise the list
+        # is patched in one go once every record has been checked
+        progressive = not self.visible_builds
+        if progressive:
+            self.visible_builds = self.next_builds
+            self.show_visible_builds()
+
+        self.render_scheduler.start(records, self.render_build_record,
+                                    on_batch=self.on_builds_added if progressive else None,
+                                    on_done=self.on_render_done)
+
+    def render_build_record(self, record):
+        build = self.builds_by_sku.get(str(record.get("sku")))
+        if build is None or build.record != record:
+            build = self.make_build(record)
+        if build is not None:
+            self.next_builds.append(build)
+
+    def on_builds_added(self):
+        """Show the builds added since the last batch without redrawing the rows already shown."""
+        self.build_scrollable_frame.items_changed()
+
+    def on_render_done(self):
+        current_skus = {str(build.sku) for build in self.next_builds}
+        for sku in [sku for sku in self.builds_by_sku if sku not in current_skus]:
+            del self.builds_by_sku[sku]
+
+        self.visible_builds = self.next_builds
+        self.show_visible_builds()
+
+    def bind_build_row(self, row, build):
+        """Fill a row of the build list in with a build."""
+        self.unbind_build_row(row)
+        row.update_build_button.config(text=f"Edit ({build.sku})", command=build.on_edit)
+        row.description_label.config(text=build.pc_str)
+
+        image_path = self.build_image_path(build)
+        photo_key = (image_path, "list")
+        photo = self.photo_cache.acquire(photo_key)
+        if photo is not None:
+            # Shown before and still cached, no need to load it again
+            row.photo_key = photo_key
+            row.show_photo(photo)
+            return
+
+        self.photo_loads_pending += 1
+        row.image_future = self.image_loader.load(
+            image_path, "list",
+            lambda image, row=row, build=build: self.swap_in_photo(row, build, photo_key, image)
+        )
+
+    @staticmethod
+    def build_image_path(build):
+        return f"../images/{build.full_pc_dict['image_file_name']}"
+
+    def unbind_build_row(self, row):
+        """Empty a row, handing its photo back to the photo cache, which may drop it."""
+        if row.image_future is not None:
+            row.image_future.cancel()
+            row.image_future = None
+            self.photo_loads_pending -= 1
+        row.show_placeholder()
+        if row.photo_key is not None:
+            self.photo_cache.release(row.photo_key)
+            row.photo_key = None
+
+    def swap_in_photo(self, row, build, photo_key, image):
+        """Replace a row's placeholder with its loaded image, called on the Tk thread."""
+        if row.item is not build or row.image_future is None:
+            # The row has been reused for another build since the load started
+            return
+
+        row.image_future = None
+        self.photo_loads_pending -= 1
+        row.photo_key = photo_key
+        row.show_photo(self.photo_cache.add(photo_key, image))
+
+        self.photos_shown += 1
+        elapsed_ms = (time.perf_counter() - self.photo_load_start) * 1000
+        if self.photos_shown == 1:
+            print(f"First build photo shown after {elapsed_ms:.0f}ms")
+        if self.photo_loads_pending == 0:
+            used_bytes, cached, on_screen = self.photo_cache.usage()
+            print(f"All {self.photos_shown} build photos in view shown after {elapsed_ms:.0f}ms, "
+                  f"photo cache holds {used_bytes / 1024 / 1024:.1f}MB in {cached} photos ({on_screen} on screen)")
+
+    def add_pc_build(self, pc_dict, full_pc_dict, sku, pc_build, record=None):
+        """Make the PCBuildUI for a build and remember it by SKU, render_builds puts it in the list."""
+        new_build = PCBuildUI(pc_dict, full_pc_dict, sku, record)
+        new_build.on_edit = lambda: self.on_update_build(sku, pc_build)
+        self.builds_by_sku[str(sku)] = new_build
+        return new_build
 
     def on_update_build(self, sku, pc_build):
         # Load the build data using the given SKU
         build = pc_build
         print(f"Button clicked, the SKU is {sku}")
+        start_time = time.perf_counter()
 
-        # Navigate to the add build scene
-        self.go_to_add_build_scene()
+        # Navigate to the add build scene, the build already has its SKU
+        self.show_add_build_scene()
         self.new_build_sku = sku
+        self.new_build_image_file_name = build.image_file_name
         self.new_sku_label.config(text=sku)
+        scene_time = time.perf_counter()
+
+        # Fill every field in from the build in one pass over the form's registry
+        self.build_form.load(build)
+        loaded_time = time.perf_counter()
 
-        # Create a dictionary to map component titles to corresponding build attributes
-        build_info = {
-            "cpu": {"name": build.cpu.name, "brand": build.cpu.brand, "price": build.cpu.price},
-            "gpu": {"name": build.gpu.name, "brand": build.gpu.brand, "price": build.gpu.price},
-            "ram": {"name": build.ram.name, "brand": build.ram.brand, "price": build.ram.price},
-            "motherboard": {"name": build.motherboard.name, "brand": build.motherboard.brand,
-                            "price": build.motherboard.price},
-            "ssd": {"name": build.ssd.name if build.ssd else None, "brand": build.ssd.brand if build.ssd else None,
-                    "price": build.ssd.price if build.ssd else None},
-            "hdd": {"name": build.hdd.name if build.hdd else None, "brand": build.hdd.brand if build.hdd else None,
-                    "price": build.hdd.price if build.hdd else None},
-            "nvme": {"name": build.nvme.name if build.nvme else None, "brand": build.nvme.brand if build.nvme else None,
-                     "price": build.nvme.price if build.nvme else None},
-            "psu": {"name": build.psu.name, "brand": build.psu.brand, "price": build.psu.price},
-            "case": {"name": build.case.name, "brand": build.case.brand, "price": build.case.price},
-            "extra costs": build.extra_costs,
-            "target sell price": build.target_sell_price,
-            "extra profit": build.extra_profit,
-            "list date": build.list_date,
-            "sell date": build.sell_date,
-            "sell price": build.sell_price,
-            "total price": build.total_price(),
-            "total profit": (build.sell_price - build.total_price()) + build.extra_profit
-        }
-
-        # Define the order of components
-        component_order = ['cpu', 'gpu', 'ram', 'motherboard', 'ssd', 'hdd', 'nvme', 'psu', 'case']
-
-        # Iterate through the defined component order
-        for component_title in component_order:
-            # Find the index of the title component in all_components
-            for i in range(len(self.all_components)):
-                component = self.all_components[i]
-                # Check if this component is a title and matches the current component_title
-                if isinstance(component, ComponentEntry) and component.label and component.label.cget(
-                        "text").lower() == component_title:
-                    print(f"Processing component: {component_title}")
-
-                    # Now, update the name, brand, and price for this component
-                    try:
-                        # Index of the title component
-                        title_index = i
-
-                        # Get name, brand, and price from build_info
-                        name_value = build_info[component_title]["name"]
-                        brand_value = build_info[component_title]["brand"]
-                        price_value = build_info[component_title]["price"]
-
-                        # Update the name entry
-                        self.all_components[title_index + 1].entry.delete(0, END)  # Clear current entry for name
-                        self.all_components[title_index + 1].entry.insert(0, str(name_value))  # Insert new name
-
-                        # Update the brand entry
-                        self.all_components[title_index + 2].entry.delete(0, END)  # Clear current entry for brand
-                        self.all_components[title_index + 2].entry.insert(0, str(brand_value))  # Insert new brand
-
-                        # Update the price entry
-                        self.all_components[title_index + 3].entry.delete(0, END)  # Clear current entry for price
-                        self.all_components[title_index + 3].entry.insert(0, str(price_value))  # Insert new price
-
-                        print(
-                            f"Updated {component_title} values: Name: {name_value}, Brand: {brand_value}, Price: {price_value}")
-                    except IndexError:
-                        print(f"Error: Unable to update components for {component_title}, index out of range.")
-
-                    # Break out of the loop once the title component has been processed
-                    break
-
-        # Handle extra values that do not belong to a component
-        extra_values = ["extra costs", "target sell price", "extra profit", "list date", "sell date", "sell price"]
-        for extra in extra_values:
-            if extra in build_info:
-                value_to_insert = build_info[extra]
-                for component in self.all_components:
-                    if isinstance(component, ComponentEntry) and component.label and component.label.cget(
-                            "text").lower() == extra:
-                        if value_to_insert is not None:
-                            component.entry.delete(0, END)  # Clear the current entry
-                            component.entry.insert(0, str(value_to_insert))  # Insert the new value
-                            print(f"Value Inserted for {extra}: {value_to_insert}")
-
-        print("Finished updating component entries.")
         self.add_build_scrollable_frame.scrollable_frame.update()  # Update the scrollable frame
+        print(f"Opened build {sku} for editing in {(time.perf_counter() - start_time) * 1000:.1f}ms "
+              f"(scene {(scene_time - start_time) * 1000:.1f}ms, "
+              f"filling in the form {(loaded_time - scene_time) * 1000:.1f}ms)")
 
     def remove_build(self, sku):
-        for build in self.visible_builds:
-            for key, value in build.pc_dict.items():
-                if key == "sku" and value == sku:
-                    build.destroy()
-                    self.window.update()
-                    self.window.update_idletasks()
-                    self.visible_builds.remove(build)
+        build = self.builds_by_sku.pop(str(sku), None)
+        if build in self.visible_builds:
+            self.visible_builds.remove(build)
+            self.show_visible_builds()
         print(self.visible_builds)
 
     def clear_visible_builds(self):
         print(self.visible_builds)
-        self.build_scrollable_frame.clear()
-        for build in self.visible_builds:
-            if build is not None:
-                build.build_image.grid_forget()
+        # Stop a render that is still adding builds, e.g. when changing scene
+        self.render_scheduler.cancel()
+        self.image_loader.cancel_all()
+        self.prefetcher.cancel()
+        # builds_by_sku is kept, so showing the builds again only remakes the ones that changed
         self.visible_builds = []
+        self.build_scrollable_frame.set_items(self.visible_builds)
         print(self.visible_builds)
 
     def start(self):
@@ -0,0 +1,113 @@
+import hashlib
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageOps
+
+from image_variants import generate_variants
+
+IMAGE_DIRECTORY = os.path.join('..', 'images')
+# Uploaded photos are scaled down to fit in this size, which is still far bigger than any view
+MAX_IMAGE_SIZE = (1600, 1600)
+# Stored as JPEG, it is small for photos and can be decoded at a reduced size cheaply
+IMAGE_FORMAT = "JPEG"
+IMAGE_EXTENSION = ".jpg"
+IMAGE_QUALITY = 85
+
+# One upload at a time is plenty, it only has to keep the work off the Tk thread
+_ingest_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="image-ingest")
+
+
+class IngestResult:
+    """What happened to an uploaded image."""
+    def __init__(self, file_name, original_bytes, stored_bytes, deduplicated):
+        """
+        :param file_name: Name of the stored image in the images directory.
+        :param original_bytes: Size of the file that was uploaded.
+        :param stored_bytes: Size of the stored image.
+        :param deduplicated: True if the same photo was already stored, so nothing was written.
+        """
+        self.file_name = file_name
+        self.original_bytes = original_bytes
+        self.stored_bytes = stored_bytes
+        self.deduplicated = deduplicated
+
+    @property
+    def bytes_saved(self):
+        return self.original_bytes - (0 if self.deduplicated else self.stored_bytes)
+
+    def __repr__(self):
+        return (f"IngestResult({self.file_name!r}, original={self.original_bytes}, "
+                f"stored={self.stored_bytes}, deduplicated={self.deduplicated})")
+
+
+def content_hash(path):
+    """Return the SHA-256 of a file's contents as hex."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def encode_image(source_path, max_size=MAX_IMAGE_SIZE):
+    """
+    Return the bytes of the image as it should be stored: turned upright using its EXIF
+    orientation, scaled down to fit in max_size and re-encoded as JPEG.
+    """
+    with Image.open(source_path) as original:
+        # Only decode as much of a big JPEG as the capped size needs
+        original.draft('RGB', max_size)
+        image = ImageOps.exif_transpose(original)
+        image.thumbnail(max_size, Image.Resampling.LANCZOS)
+
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        # JPEG has no transparency, put it on a white background
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        image = background
+    elif image.mode != 'RGB':
+        image = image.convert('RGB')
+
+    output = io.BytesIO()
+    image.save(output, format=IMAGE_FORMAT, quality=IMAGE_QUALITY, optimize=True)
+    return output.getvalue()
+
+
+def ingest_image(source_path, directory=IMAGE_DIRECTORY):
+    """
+    Store an uploaded image in the images directory under the hash of its contents, and
+    make its preview, display and list sized variants.
+
+    The same photo uploaded for several builds is only stored once, and isn't even decoded
+    the second time.
+
+    :return: IngestResult, its file_name is what goes in the build's image_file_name.
+    """
+    original_bytes = os.path.getsize(source_path)
+    file_name = content_hash(source_path)[:32] + IMAGE_EXTENSION
+    destination_path = os.path.join(directory, file_name)
+
+    if os.path.exists(destination_path):
+        # Only makes variants that have been evicted from the thumbnail cache
+        generate_variants(destination_path)
+        return IngestResult(file_name, original_bytes, os.path.getsize(destination_path), True)
+
+    encoded = encode_image(source_path)
+
+    os.makedirs(directory, exist_ok=True)
+    temp_path = f"{destination_path}.{threading.get_ident()}.tmp"
+    with open(temp_path, 'wb') as file:
+        file.write(encoded)
+    os.replace(temp_path, destination_path)
+    generate_variants(destination_path)
+
+    return IngestResult(file_name, original_bytes, len(encoded), False)
+
+
+def ingest_in_background(source_path, directory=IMAGE_DIRECTORY):
+    """Run ingest_image on the ingest thread, returns a Future of the IngestResult."""
+    return _ingest_executor.submit(ingest_image, source_path, directory)
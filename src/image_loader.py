@@ -0,0 +1,136 @@
+import itertools
+import os
+import queue
+import threading
+from concurrent.futures import Future
+
+from image_variants import get_variant_image, get_variant_path
+
+IMAGE_LOADER_THREADS = 4
+# How often the Tk thread checks for finished images
+POLL_INTERVAL_MS = 15
+
+# Shown instead of an image that can't be loaded, e.g. one that is missing
+DEFAULT_IMAGE_PATH = os.path.join('..', 'images', 'default_image.png')
+
+# Images for rows on screen are loaded before images prefetched for rows about to scroll in
+PRIORITY_VISIBLE = 0
+PRIORITY_PREFETCH = 1
+
+
+class ImageLoader:
+    """
+    Loads resized build images on a thread pool and hands them back on the Tk thread.
+
+    Pillow releases the GIL while decoding and resizing, so several images load at once
+    without freezing the window. Tk isn't thread safe, so finished images are queued and
+    picked up by a window.after poll, which calls each image's callback on the Tk thread.
+
+    Work is taken from a priority queue rather than in order, so prefetching never holds up
+    the images the user is looking at.
+    """
+    def __init__(self, window, max_workers=IMAGE_LOADER_THREADS, default_image_path=DEFAULT_IMAGE_PATH):
+        """
+        :param window: The Tk window, used to poll for finished images.
+        :param max_workers: How many images load at once.
+        :param default_image_path: Image shown instead of one that can't be loaded.
+        """
+        self.window = window
+        self.default_image_path = default_image_path
+        self._work = queue.PriorityQueue()
+        # Keeps work with the same priority in the order it was submitted
+        self._sequence = itertools.count()
+        self._finished = queue.SimpleQueue()
+        self._pending = set()
+        self._polling = False
+
+        self._workers = [threading.Thread(target=self._run_worker, name=f"image-loader-{i}", daemon=True)
+                         for i in range(max_workers)]
+        for worker in self._workers:
+            worker.start()
+
+    def _submit(self, priority, function, *args):
+        future = Future()
+        self._work.put((priority, next(self._sequence), future, function, args))
+        return future
+
+    def _run_worker(self):
+        while True:
+            priority, _, future, function, args = self._work.get()
+            if future is None:
+                # Shut down
+                return
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(function(*args))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def _load_variant(self, image_path, variant):
+        """Load a variant of the image, or of the default image if the image can't be loaded."""
+        try:
+            return get_variant_image(image_path, variant)
+        except Exception as e:
+            print(f"Error loading image {image_path}, showing the default image instead: {e}")
+            return get_variant_image(self.default_image_path, variant)
+
+    def load(self, image_path, variant, callback):
+        """
+        Start loading a pre-sized variant of the image, e.g. "list".
+
+        :param callback: Called on the Tk thread with the PIL Image once it has loaded, which
+            is the default image if the image itself couldn't be loaded, e.g. it's missing.
+        :return: The Future of the load, which can be cancelled.
+        """
+        future = self._submit(PRIORITY_VISIBLE, self._load_variant, image_path, variant)
+        self._pending.add(future)
+        future.add_done_callback(lambda done: self._finished.put((done, callback)))
+        self._schedule_poll()
+        return future
+
+    def prefetch(self, image_path, variant):
+        """
+        Make sure a variant of the image is in the thumbnail cache, after any loads for rows
+        on screen. Nothing is handed back to the Tk thread.
+
+        :return: The Future of the prefetch, which can be cancelled.
+        """
+        return self._submit(PRIORITY_PREFETCH, get_variant_path, image_path, variant)
+
+    def _schedule_poll(self):
+        if not self._polling:
+            self._polling = True
+            self.window.after(POLL_INTERVAL_MS, self._poll)
+
+    def _poll(self):
+        while True:
+            try:
+                future, callback = self._finished.get_nowait()
+            except queue.Empty:
+                break
+
+            self._pending.discard(future)
+            if future.cancelled():
+                continue
+            try:
+                image = future.result()
+            except Exception as e:
+                print(f"Error loading image: {e}")
+                continue
+            callback(image)
+
+        self._polling = False
+        if self._pending:
+            self._schedule_poll()
+
+    def cancel_all(self):
+        """Cancel every load that hasn't started yet, e.g. when the list is cleared."""
+        for future in list(self._pending):
+            future.cancel()
+
+    def shutdown(self):
+        self.cancel_all()
+        for _ in self._workers:
+            # Sorts ahead of any work, so the workers stop straight away
+            self._work.put((-1, next(self._sequence), None, None, None))
@@ -2,10 +2,15 @@ import tkinter as tk
 from tkinter import filedialog, messagebox
 from PIL import Image, ImageTk
 import os
-import shutil
 import random
 import string
 
+from image_ingest import ingest_in_background, IMAGE_DIRECTORY
+from image_variants import get_variant_image
+
+# How often the uploader checks whether the upload has finished
+UPLOAD_POLL_MS = 50
+
 
 class ImageUploaderApp:
     def __init__(self, parent_window, display_callback, sku):
@@ -47,8 +52,8 @@ class ImageUploaderApp:
         Display a preview of the selected image.
         :param filepath: Path to the image file.
         """
-        img = Image.open(filepath)
-        img = img.resize((300, 200), Image.Resampling.LANCZOS)
+        # 300x200, made along with the other sizes from a single decode
+        img = get_variant_image(filepath, "preview")
         self.tk_image = ImageTk.PhotoImage(img)
 
         self.preview_label.configure(image=self.tk_image)
@@ -73,20 +78,36 @@ class ImageUploaderApp:
     def upload_image(self):
         """
         Save the selected image and pass the image path to the main display window.
+
+        The image is scaled down, turned upright and re-encoded on the ingest thread, then
+        stored under the hash of its contents, so the window doesn't freeze on big photos.
         """
         if self.image_path:
-            file_extension = os.path.splitext(self.image_path)[1]
-            random_filename = str(self.sku)
-            destination_path = f"../images/{random_filename}{file_extension}"
-
-            shutil.copy(self.image_path, destination_path)
-            messagebox.showinfo("Success", "Image uploaded successfully!")
-
-            # Pass the path to the display callback for showing the image in another window
-            self.display_callback(destination_path)
+            self.upload_btn.config(state="disabled", text="Uploading...")
+            future = ingest_in_background(self.image_path)
+            self.parent_window.after(UPLOAD_POLL_MS, lambda: self.finish_upload(future))
         else:
             messagebox.showwarning("No Image", "Please select an image first.")
 
+    def finish_upload(self, future):
+        """Wait for the ingest thread, then pass the stored image's path to the display callback."""
+        if not future.done():
+            self.parent_window.after(UPLOAD_POLL_MS, lambda: self.finish_upload(future))
+            return
+
+        self.upload_btn.config(state="normal", text="Upload")
+        try:
+            result = future.result()
+        except Exception as e:
+            messagebox.showerror("Upload Failed", f"Unable to upload the image: {e}")
+            return
+
+        print(f"Uploaded {result}, saved {result.bytes_saved / 1024:.0f}KB")
+        messagebox.showinfo("Success", "Image uploaded successfully!")
+
+        # Pass the path to the display callback for showing the image in another window
+        self.display_callback(os.path.join(IMAGE_DIRECTORY, result.file_name))
+
 
 def open_image_uploader(display_callback, sku):
     root = tk.Toplevel()  # Use Toplevel to open a new window
@@ -94,17 +115,3 @@ def open_image_uploader(display_callback, sku):
     root.resizable(False, False)
     app = ImageUploaderApp(root, display_callback, sku)
     root.mainloop()
-
-
-def resize_image(image_path, width, height):
-    '''Returns a tkinter PhotoImage resized to the specified width and height'''
-    # Open the image using Pillow
-    original_image = Image.open(image_path)
-
-    # Resize the image to the given width and height
-    resized_image = original_image.resize((width, height))
-
-    # Convert the resized image to a Tkinter-compatible PhotoImage object
-    tk_image = ImageTk.PhotoImage(resized_image)
-
-    return tk_image
\ No newline at end of file
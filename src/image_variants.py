@@ -0,0 +1,106 @@
+from PIL import Image
+
+from thumbnail_cache import thumbnail_cache
+
+# Every size a build image is shown at
+VARIANT_SIZES = {
+    "preview": (300, 200),  # The uploader's preview of the picked image
+    "display": (300, 250),  # The uploaded image on the add build scene
+    "list": (350, 300),  # Each build in the build list
+}
+
+# How images are decoded to make variants:
+# "best" decodes the full image, "balanced" decodes at no less than twice the variant size
+# and "fast" at no less than the variant size itself, with a cheaper final resample
+PREVIEW_QUALITY = "balanced"
+PREVIEW_QUALITY_SETTINGS = {
+    # quality: (how many times the final size to decode at, or None for full size, resampling)
+    "best": (None, Image.Resampling.LANCZOS),
+    "balanced": (2, Image.Resampling.LANCZOS),
+    "fast": (1, Image.Resampling.BILINEAR),
+}
+# Modes reduce() and the resampling filters work on, others are converted to RGB or RGBA first
+RESAMPLE_MODES = ("L", "RGB", "RGBA", "LA", "CMYK")
+
+
+def _resample_mode(image):
+    """
+    Convert palette, 1-bit, 16-bit and other unusual modes to RGB, or RGBA if the image has
+    transparency. reduce() raises on them, and resize() would only use nearest neighbour.
+    """
+    if image.mode in RESAMPLE_MODES:
+        return image
+    has_alpha = image.mode.endswith("A") or "transparency" in image.info
+    converted = image.convert("RGBA" if has_alpha else "RGB")
+    image.close()
+    return converted
+
+
+def open_reduced(image_path, size, quality=PREVIEW_QUALITY):
+    """
+    Open and decode an image at a fraction of its full resolution, still big enough to be
+    resampled down to size without losing quality.
+
+    JPEGs are decoded at 1/2, 1/4 or 1/8 scale using draft(), which skips most of the
+    decoding work. Other formats are decoded in full and then shrunk with reduce(), a fast
+    box filter, so the final high quality resample has fewer pixels to go through.
+
+    :return: (loaded PIL Image, resampling filter to use for the final resize)
+    """
+    headroom, resampling = PREVIEW_QUALITY_SETTINGS[quality]
+    image = Image.open(image_path)
+    if headroom is None:
+        image.load()
+        return _resample_mode(image), resampling
+
+    decode_size = (size[0] * headroom, size[1] * headroom)
+    image.draft(None, decode_size)
+    image.load()
+    image = _resample_mode(image)
+
+    factor = min(image.width // decode_size[0], image.height // decode_size[1])
+    if factor > 1:
+        image = image.reduce(factor)
+    return image, resampling
+
+
+def _make_variants(image_path, variant):
+    """
+    Decode the image once and resize it to every variant size, storing all but the requested
+    variant in the thumbnail cache. Returns the requested one, which get_path stores itself.
+    """
+    largest = (max(width for width, _ in VARIANT_SIZES.values()), max(height for _, height in VARIANT_SIZES.values()))
+    original, resampling = open_reduced(image_path, largest)
+    with original:
+        resized = {name: original.resize(size, resampling) for name, size in VARIANT_SIZES.items()}
+
+    for name, image in resized.items():
+        if name != variant:
+            thumbnail_cache.put(image_path, *VARIANT_SIZES[name], image)
+    return resized[variant]
+
+
+def get_variant_path(image_path, variant):
+    """
+    Return the path of a pre-sized variant of an image, e.g. "list".
+
+    The first request for any variant of an image makes all of them from one decode, after
+    that every variant is a file of exactly the right size in the thumbnail cache.
+    """
+    width, height = VARIANT_SIZES[variant]
+    return thumbnail_cache.get_path(image_path, width, height,
+                                    resize=lambda path, _width, _height: _make_variants(path, variant))
+
+
+def get_variant_image(image_path, variant):
+    """Return a variant of an image as a loaded PIL Image."""
+    with Image.open(get_variant_path(image_path, variant)) as image:
+        image.load()
+        return image
+
+
+def generate_variants(image_path):
+    """Make every variant of an image now, e.g. straight after it is uploaded."""
+    for variant in VARIANT_SIZES:
+        get_variant_path(image_path, variant)
+
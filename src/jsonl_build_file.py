@@ -0,0 +1,246 @@
+import json
+import mmap
+import os
+import struct
+import threading
+from array import array
+
+# One entry of the index file: SKU, offset of the build's line and its length without the newline
+INDEX_ENTRY = struct.Struct('<qQL')
+
+# Compact once superseded lines take up this much of the file, and at least COMPACT_MIN_BYTES
+COMPACT_GARBAGE_RATIO = 0.5
+COMPACT_MIN_BYTES = 1024 * 1024
+
+
+class JsonlBuildFile:
+    """
+    Builds stored one per line in a JSONL file, with a sidecar index of where each build's
+    line is.
+
+    Saving a build appends its whole record as a new line and an (SKU, offset, length)
+    entry to the index, so writes never rewrite the file. The latest line for a SKU wins.
+    Reading a build looks its line up in the index and decodes just that line from a
+    read-only mmap of the file, rather than parsing every build.
+
+    Superseded lines are only removed by compact(), which happens once they make up more
+    than COMPACT_GARBAGE_RATIO of the file.
+
+    The JSONL file is the source of truth. If the index is missing or behind, e.g. after a
+    crash between the two appends, it is brought up to date from the file when it's opened.
+    """
+    def __init__(self, path, index_path=None, compact_ratio=COMPACT_GARBAGE_RATIO, compact_min_bytes=COMPACT_MIN_BYTES):
+        """
+        :param path: Path to the JSONL file.
+        :param index_path: Path to the index, defaults to the JSONL path with .idx added.
+        :param compact_ratio: Fraction of the file that can be superseded lines before compacting.
+        :param compact_min_bytes: Never compact while the superseded lines take up less than this.
+        """
+        self.path = path
+        self.index_path = index_path or path + '.idx'
+        self.compact_ratio = compact_ratio
+        self.compact_min_bytes = compact_min_bytes
+
+        self._lock = threading.RLock()
+        # SKU -> (offset, length) of its latest line, in the order the builds were first added
+        self._index = None
+        self._size = 0
+        # Bytes taken up by superseded lines
+        self._garbage = 0
+        self._mmap = None
+
+        self.appends = 0
+        self.compactions = 0
+
+    def _load(self):
+        """Read the index and check it against the JSONL file, fixing it up if need be."""
+        self._index = {}
+        self._garbage = 0
+        data_size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+        indexed_end = 0
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'rb') as file:
+                entries = file.read()
+            # A torn entry at the end is dropped, the scan below puts it back
+            whole = len(entries) - len(entries) % INDEX_ENTRY.size
+            for sku, offset, length in INDEX_ENTRY.iter_unpack(entries[:whole]):
+                self._set(sku, offset, length)
+            if whole:
+                # Entries are always written in file order, so the last one ends the indexed part
+                _, offset, length = INDEX_ENTRY.unpack_from(entries, whole - INDEX_ENTRY.size)
+                indexed_end = offset + length + 1
+            if whole != len(entries):
+                with open(self.index_path, 'r+b') as file:
+                    file.truncate(whole)
+
+        if indexed_end > data_size:
+            # The index is for a different file, start again from the JSONL file
+            print(f"Index {self.index_path} doesn't match {self.path}, rebuilding it.")
+            os.remove(self.index_path)
+            self._index = {}
+            self._garbage = 0
+            indexed_end = 0
+
+        self._size = indexed_end
+        if indexed_end < data_size:
+            self._index_lines(indexed_end)
+
+    def _index_lines(self, start):
+        """Add index entries for every line from start to the end of the JSONL file."""
+        entries = bytearray()
+        offset = start
+        with open(self.path, 'rb') as file:
+            file.seek(start)
+            for line in file:
+                if not line.endswith(b'\n'):
+                    # A torn final line from a crash mid-append, everything before it is fine
+                    print(f"Dropping an incomplete build at the end of {self.path}.")
+                    break
+                try:
+                    sku = int(json.loads(line)['sku'])
+                except (ValueError, KeyError, TypeError):
+                    print(f"Skipping unreadable build in {self.path} at byte {offset}.")
+                    self._garbage += len(line)
+                    offset += len(line)
+                    continue
+                self._set(sku, offset, len(line) - 1)
+                entries += INDEX_ENTRY.pack(sku, offset, len(line) - 1)
+                offset += len(line)
+
+        if offset < os.path.getsize(self.path):
+            with open(self.path, 'r+b') as file:
+                file.truncate(offset)
+        with open(self.index_path, 'ab') as file:
+            file.write(entries)
+        self._size = offset
+
+    def _set(self, sku, offset, length):
+        previous = self._index.get(sku)
+        if previous is not None:
+            self._garbage += previous[1] + 1
+        self._index[sku] = (offset, length)
+
+    def _ensure_loaded(self):
+        if self._index is None:
+            self._load()
+
+    def _view(self):
+        """Return an mmap of the JSONL file, mapped again if the file has grown since."""
+        if self._mmap is None or len(self._mmap) < self._size:
+            # The old map isn't closed as iterators may still be reading it, it goes with its last reference
+            with open(self.path, 'rb') as file:
+                self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mmap
+
+    def get(self, sku):
+        """Return the build record for the given SKU, or None if there isn't one."""
+        try:
+            sku = int(sku)
+        except (TypeError, ValueError):
+            return None
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._index.get(sku)
+            if entry is None:
+                return None
+            offset, length = entry
+            return json.loads(self._view()[offset:offset + length])
+
+    def __iter__(self):
+        """
+        Yield every build record in the order they were first added.
+
+        Only the offsets are copied up front, each build is decoded as it's reached.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            if not self._index:
+                return
+            offsets = array('Q', (offset for offset, _ in self._index.values()))
+            lengths = array('L', (length for _, length in self._index.values()))
+            # Holding on to the map keeps it valid even if the file is compacted meanwhile
+            view = self._view()
+
+        for offset, length in zip(offsets, lengths):
+            yield json.loads(view[offset:offset + length])
+
+    def __len__(self):
+        with self._lock:
+            self._ensure_loaded()
+            return len(self._index)
+
+    def append_many(self, records):
+        """Append build records, each a complete build with its SKU, with a single write and fsync."""
+        lines = [json.dumps(record, separators=(',', ':')).encode('utf-8') + b'\n' for record in records]
+        if not lines:
+            return
+
+        with self._lock:
+            self._ensure_loaded()
+            entries = bytearray()
+            offset = self._size
+            with open(self.path, 'ab') as file:
+                file.write(b''.join(lines))
+                file.flush()
+                os.fsync(file.fileno())
+
+            for record, line in zip(records, lines):
+                sku = int(record['sku'])
+                self._set(sku, offset, len(line) - 1)
+                entries += INDEX_ENTRY.pack(sku, offset, len(line) - 1)
+                offset += len(line)
+            # Not synced, the index can always be rebuilt from the JSONL file
+            with open(self.index_path, 'ab') as file:
+                file.write(entries)
+
+            self._size = offset
+            self.appends += len(lines)
+
+            if self._garbage >= self.compact_min_bytes and self._garbage > self._size * self.compact_ratio:
+                self.compact()
+
+    def append(self, record):
+        self.append_many([record])
+
+    def compact(self):
+        """Rewrite the file with only the latest line for each build, and a fresh index."""
+        with self._lock:
+            self._ensure_loaded()
+            temp_path = self.path + '.compact.tmp'
+            temp_index_path = self.index_path + '.compact.tmp'
+
+            view = self._view() if self._size else None
+            offset = 0
+            index = {}
+            with open(temp_path, 'wb') as data_file, open(temp_index_path, 'wb') as index_file:
+                for sku, (old_offset, length) in self._index.items():
+                    data_file.write(view[old_offset:old_offset + length + 1])
+                    index_file.write(INDEX_ENTRY.pack(sku, offset, length))
+                    index[sku] = (offset, length)
+                    offset += length + 1
+                data_file.flush()
+                os.fsync(data_file.fileno())
+
+            # Iterators still reading the old file keep their own reference to its map
+            self._mmap = None
+            view = None
+            # Without an index the new file is indexed from scratch when opened, so a crash
+            # between these steps can't pair the new file with the old index
+            if os.path.exists(self.index_path):
+                os.remove(self.index_path)
+            os.replace(temp_path, self.path)
+            os.replace(temp_index_path, self.index_path)
+
+            reclaimed = self._garbage
+            self._index = index
+            self._size = offset
+            self._garbage = 0
+            self.compactions += 1
+        print(f"Compacted {self.path}, {reclaimed} bytes of old builds removed.")
+
+    def close(self):
+        with self._lock:
+            if self._mmap is not None:
+                self._mmap.close()
+                self._mmap = None
@@ -0,0 +1,304 @@
+"""
+The PCBuild model, kept apart from the GUI so builds can be made and saved without Tk,
+e.g. by the command line importer in pcflipping.py.
+"""
+
+import os
+
+from storage import get_storage
+from components import Component, CPU, GPU, RAM, SSD, HardDrive, NVMe, PSU, Case, Motherboard
+from component_codec import encode_component, decode_component
+
+# Every component slot of a build and the component class it holds
+COMPONENT_SLOTS = {
+    "cpu": CPU,
+    "gpu": GPU,
+    "ram": RAM,
+    "motherboard": Motherboard,
+    "ssd": SSD,
+    "hdd": HardDrive,
+    "nvme": NVMe,
+    "psu": PSU,
+    "case": Case,
+}
+# Slots a build doesn't have to have a part in
+OPTIONAL_SLOTS = ("ssd", "hdd", "nvme")
+
+
+def build_total_price(slot_prices, extra_costs):
+    """
+    The total price of a build: the part in every slot plus the extra costs.
+
+    This and build_profit are the one definition of a build's cost and profit, used by
+    PCBuild, analytics and the exporter so they always agree. Both work on plain numbers
+    or on whole NumPy columns at once.
+
+    :param slot_prices: slot -> price of the part in it, 0 for an empty slot.
+    """
+    return sum(slot_prices[slot] for slot in COMPONENT_SLOTS) + extra_costs
+
+
+def build_profit(sell_price, total_price, extra_profit):
+    """Profit from selling a build for sell_price, see build_total_price."""
+    return (sell_price - total_price) + extra_profit
+
+
+class PCBuild:
+    # Number of times any build has been written to storage
+    write_count = 0
+
+    def __init__(self, sku, cpu, gpu, ram, motherboard,
+                 ssd=None, hdd=None, nvme=None, psu=None, case=None,
+                 target_sell_price=0.0, extra_costs=0.0, extra_profit=0.0,
+                 list_date="01/01/2024", sell_date="02/01/2024", persist=True):
+
+        # Validate and set components
+        self.cpu = self.validate_component(cpu, "CPU")
+        self.gpu = self.validate_component(gpu, "GPU")
+        self.ram = self.validate_component(ram, "RAM")
+        self.motherboard = self.validate_component(motherboard, "Motherboard")
+        self.ssd = self.validate_component(ssd, "SSD", allow_none=True)
+        self.hdd = self.validate_component(hdd, "HDD", allow_none=True)
+        self.nvme = self.validate_component(nvme, "NVMe", allow_none=True)
+        self.psu = self.validate_component(psu, "PSU")
+        self.case = self.validate_component(case, "Case")
+
+        # Other build attributes
+        self.extra_costs = extra_costs
+        self.target_sell_price = target_sell_price
+        self.extra_profit = extra_profit
+        self.list_date = list_date
+        self.sell_date = sell_date
+        self.sold = False
+        self.sell_price = 0
+
+        # Image and SKU management
+        self.image_file_name = f"{sku}.png"
+        self.image_path = None
+
+        self.sku = sku
+        self.components = [self.cpu, self.gpu, self.ram, self.motherboard, self.ssd, self.hdd, self.nvme, self.psu, self.case]
+
+        # Dirty tracking, only builds that have changed get written back
+        self.dirty = persist
+        self.writes = 0
+
+        # Update the build in a persistent storage (e.g., JSON)
+        self.save()
+
+    @classmethod
+    def from_record(cls, record):
+        """
+        Create a PCBuild from a stored build record without writing anything to disk.
+        Parts that are in other loaded builds too are shared rather than duplicated.
+
+        :param record: A build dictionary as produced by to_dict().
+        """
+        cpu = decode_component(record.get("cpu"), shared=True)
+        gpu = decode_component(record.get("gpu"), shared=True)
+        ram = decode_component(record.get("ram"), shared=True)
+        ssd = decode_component(record.get("ssd"), shared=True)
+        hdd = decode_component(record.get("hdd"), shared=True)
+        nvme = decode_component(record.get("nvme"), shared=True)
+        psu = decode_component(record.get("psu"), shared=True)
+        case = decode_component(record.get("case"), shared=True)
+        motherboard = decode_component(record.get("motherboard"), shared=True)
+
+        pc_build = cls(
+            sku=record["sku"], cpu=cpu, gpu=gpu, ram=ram,
+            ssd=ssd, hdd=hdd, nvme=nvme,
+            psu=psu, case=case, motherboard=motherboard,
+            target_sell_price=record.get("target_sell_price", 0),
+            extra_costs=record.get("extra_costs", 0),
+            extra_profit=record.get("extra_profit", 0),
+            list_date=record.get("list_date", "01/01 2024"),
+            sell_date=record.get("sell_date", "02/01 2024"),
+            persist=False
+        )
+        pc_build.sold = record.get("sold", False)
+        pc_build.sell_price = record.get("sell_price", 0)
+        if record.get("image_file_name"):
+            pc_build.image_file_name = record["image_file_name"]
+        return pc_build
+
+    def mark_dirty(self):
+        """Flag the build as changed so the next save() writes it."""
+        self.dirty = True
+
+    def save(self):
+        """
+        Write the build to storage if it has changed since it was last saved.
+
+        :return: True if the build was written, False if there was nothing to save or it couldn't be saved.
+        """
+        if not self.dirty:
+            return False
+        if not self.update_build_in_json(self.sku, self.to_dict()):
+            # Still dirty, so the next save() tries again
+            return False
+        self.dirty = False
+        self.writes += 1
+        return True
+
+    @staticmethod
+    def validate_component(component, expected_type, allow_none=False):
+        """Helper function to validate component types."""
+        if allow_none and component is None:
+            return None
+        if not isinstance(component, Component):
+            raise TypeError(f"Expected {expected_type}, but got {type(component).__name__}")
+        return component
+
+    def total_price(self):
+        """Calculate the total price of the build including extra costs."""
+        slot_prices = {}
+        for slot in COMPONENT_SLOTS:
+            component = getattr(self, slot)
+            slot_prices[slot] = component.price if component is not None else 0.0
+        return build_total_price(slot_prices, self.extra_costs)
+
+    def target_profit(self):
+        """Calculate profit based on the target sell price."""
+        return build_profit(self.target_sell_price, self.total_price(), self.extra_profit)
+
+    def total_profit(self):
+        """Calculate the profit the build sold for."""
+        return build_profit(self.sell_price, self.total_price(), self.extra_profit)
+
+    def update_extra_costs(self, new_extra_costs):
+        """Update the extra costs, e.g., for shipping, labor, etc."""
+        if new_extra_costs != self.extra_costs:
+            self.extra_costs = new_extra_costs
+            self.mark_dirty()
+        self.save()
+
+    def set_to_sold(self, sell_price, sell_date):
+        """Mark the build as sold and update the selling information."""
+        if not self.sold or sell_price != self.sell_price or sell_date != self.sell_date:
+            self.sold = True
+            self.sell_price = sell_price
+            self.sell_date = sell_date
+            self.mark_dirty()
+
+        self.save()
+
+    def update_build(self, extra_costs, sold, sell_price, sell_date):
+        """Update the entire build, use this when reading a build from Build.json."""
+        self.update_extra_costs(extra_costs)
+        if sold:
+            self.set_to_sold(sell_price, sell_date)
+
+    def to_dict(self):
+        """Serialize the PCBuild object to a dictionary for JSON storage."""
+        return {
+            "cpu": encode_component(self.cpu),
+            "gpu": encode_component(self.gpu),
+            "motherboard": encode_component(self.motherboard),
+            "ram": encode_component(self.ram),
+            "ssd": encode_component(self.ssd),
+            "hdd": encode_component(self.hdd),
+            "nvme": encode_component(self.nvme),
+            "psu": encode_component(self.psu),
+            "case": encode_component(self.case),
+            "extra_costs": self.extra_costs,
+            "target_sell_price": self.target_sell_price,
+            "extra_profit": self.extra_profit,
+            "list_date": self.list_date,
+            "sell_date": self.sell_date,
+            "sold": self.sold,
+            "sell_price": self.sell_price,
+            "sku": self.sku,
+            "image_file_name": self.image_file_name
+        }
+
+    def to_dict_name(self):
+        """Serialize the PCBuild object to a dictionary with component names."""
+        return {
+            "sku": self.sku,
+            "CPU": self.cpu.name,
+            "GPU": self.gpu.name,
+            "RAM": self.ram.name,
+            "Motherboard": self.motherboard.name,
+            "SSD": self.ssd.name if self.ssd else None,
+            "HDD": self.hdd.name if self.hdd else None,
+            "NVME": self.nvme.name if self.nvme else None,
+            "PSU": self.psu.name,
+            "Case": self.case.name,
+            "Extra Costs": self.extra_costs,
+            "Target Sell Price": self.target_sell_price,
+            "Extra Profit": self.extra_profit,
+            "List Date": self.list_date,
+            "Sell Date": self.sell_date,
+            "Sell Price": self.sell_price,
+            "Total Price": self.total_price(),
+            "Total Profit": self.total_profit()
+        }
+
+    def set_sku(self, sku):
+        """Set the SKU for the build."""
+        self.sku = sku
+
+    def add_image(self, image_file_name):
+        """Set the image file name and compute the image path."""
+        if image_file_name != self.image_file_name:
+            self.image_file_name = image_file_name
+            self.mark_dirty()
+        self.image_path = os.path.join('..', 'images', image_file_name)
+
+    @staticmethod
+    def update_build_in_json(sku, updated_data):
+        """
+        Update an existing build in storage based on the given SKU.
+        If the build doesn't exist, add the new build.
+
+        :param sku: The SKU of the build to update or add.
+        :param updated_data: A dictionary containing the updated fields for the build.
+        :return: True if storage has the build as given, False if saving it failed.
+        """
+        try:
+            if get_storage().save_build(sku, updated_data):
+                PCBuild.write_count += 1
+                print(f"Build with SKU {sku} has been successfully updated or added.")
+            return True
+
+        except Exception as e:
+            print(f"Error updating or adding build: {e}")
+            return False
+
+    def __str__(self):
+        """Return a detailed string representation of the PC build."""
+        build_info = "PC Build Components:\n"
+        for component in self.components:
+            if isinstance(component, list):  # For components like RAM (list of sticks)
+                for stick in component:
+                    build_info += f" - {stick}\n"
+            elif component is not None:
+                build_info += f" - {component}\n"
+        build_info += f"SKU: {self.sku}\n"
+        build_info += f"List Date: {self.list_date}\n"
+        build_info += f"Extra Costs: £{self.extra_costs}\n"
+        build_info += f"Total Price: £{self.total_price()}\n"
+        build_info += f"Target Sell Price: £{self.target_sell_price}\n"
+        build_info += f"Extra Profit: £{self.extra_profit}\n"
+        build_info += f"Target Profit (includes extra profit): £{self.target_profit()}\n"
+        build_info += f"Has Sold: {self.sold}\n"
+        if self.sold:
+            build_info += f"Sell Price: £{self.sell_price} "
+            build_info += f"Total Profit: £{self.total_profit()}\n"
+            build_info += f"Sell Date: {self.sell_date}"
+
+        return build_info
+
+
+def load_build_from_sku(sku):
+    try:
+        build = get_storage().get_build(sku)
+        if build is None:
+            print(f"No build found with SKU {sku}.")
+            return None
+
+        # Hydrate without touching disk, viewing a build shouldn't rewrite Builds.json
+        return PCBuild.from_record(build)
+    except Exception as e:
+        print(f"Error reading a build with SKU {sku}: {e}")
+        return None
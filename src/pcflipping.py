@@ -0,0 +1,120 @@
+"""
+Command line tools for working with builds without the GUI, run from the src directory.
+
+    python -m pcflipping import builds.csv
+    python -m pcflipping --backend sqlite import builds.jsonl --strict
+    python -m pcflipping export sales.csv --sold --date-field sell_date --since 01/01/2025
+    python -m pcflipping export - --format jsonl --columns sku,cpu_name,gpu_name,realized_profit
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import storage
+from build_export import export_builds, check_columns, COLUMNS, DEFAULT_COLUMNS, EXPORT_FORMATS
+from build_import import import_builds, detect_format, IMPORT_FORMATS
+from sku_allocator import SkuRangeExhaustedError
+
+# How many skipped rows to list before just counting the rest
+MAX_ERRORS_SHOWN = 20
+
+
+def run_import(args, build_storage):
+    try:
+        result = import_builds(args.path, build_storage, file_format=args.format,
+                               strict=args.strict, dry_run=args.dry_run)
+    except (OSError, ValueError, SkuRangeExhaustedError) as e:
+        print(f"Unable to import {args.path}: {e}")
+        return 1
+
+    for error in result.errors[:MAX_ERRORS_SHOWN]:
+        print(error)
+    if len(result.errors) > MAX_ERRORS_SHOWN:
+        print(f"... and {len(result.errors) - MAX_ERRORS_SHOWN} more.")
+
+    if args.strict and result.errors:
+        print(f"Nothing imported from {args.path}, {len(result.errors)} rows are invalid.")
+        return 1
+    action = "Checked" if args.dry_run else "Imported"
+    print(f"{action} {result.imported} builds from {args.path} in {result.seconds * 1000:.0f}ms, "
+          f"{result.skipped} rows skipped.")
+    return 1 if result.errors else 0
+
+
+def run_export(args, build_storage):
+    columns = tuple(name.strip() for name in args.columns.split(',')) if args.columns else DEFAULT_COLUMNS
+    try:
+        check_columns(columns)
+        file_format = args.format or ("csv" if args.path == "-" else detect_format(args.path))
+        since, until = (_iso_date(date, label) for date, label in ((args.since, "--since"), (args.until, "--until")))
+    except ValueError as e:
+        print(f"Unable to export: {e}")
+        return 1
+
+    start = time.perf_counter()
+    if args.path == "-":
+        count = export_builds(build_storage, sys.stdout, file_format, columns,
+                              sold=args.sold, date_field=args.date_field, since=since, until=until)
+        # The summary goes to stderr so it doesn't end up in the exported rows
+        summary_file = sys.stderr
+    else:
+        # Written next to the destination first, so a failed export never leaves half a file
+        temp_path = args.path + '.tmp'
+        with open(temp_path, 'w', newline='', encoding='utf-8') as file:
+            count = export_builds(build_storage, file, file_format, columns,
+                                  sold=args.sold, date_field=args.date_field, since=since, until=until)
+        os.replace(temp_path, args.path)
+        summary_file = sys.stdout
+    print(f"Exported {count} builds to {args.path} in {(time.perf_counter() - start) * 1000:.0f}ms.", file=summary_file)
+    return 0
+
+
+def _iso_date(date, label):
+    """Convert a dd/mm/yyyy date from the command line for BuildStorage.iter_builds."""
+    if date is None:
+        return None
+    iso_date = storage.to_iso_date(date)
+    if iso_date is None:
+        raise ValueError(f"{label} '{date}' isn't a dd/mm/yyyy date")
+    return iso_date
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="pcflipping", description="Work with PC Flipping builds without the GUI.")
+    parser.add_argument("--backend", choices=("json", "journal", "sqlite", "jsonl"), default=storage.STORAGE_BACKEND,
+                        help="Where builds are stored, default is %(default)s")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser("import", help="Import builds from a CSV or JSONL file")
+    import_parser.add_argument("path", help="The file to import")
+    import_parser.add_argument("--format", choices=IMPORT_FORMATS, help="Format of the file, default is from its extension")
+    import_parser.add_argument("--strict", action="store_true", help="Import nothing if any row is invalid")
+    import_parser.add_argument("--dry-run", action="store_true", help="Check the file without saving anything")
+    import_parser.set_defaults(run=run_import)
+
+    export_parser = commands.add_parser("export", help="Export builds to a CSV or JSONL file")
+    export_parser.add_argument("path", help="The file to write, or - for standard output")
+    export_parser.add_argument("--format", choices=EXPORT_FORMATS, help="Format of the file, default is from its extension")
+    export_parser.add_argument("--columns", help=f"Comma separated columns, from: {', '.join(COLUMNS)}")
+    sold_group = export_parser.add_mutually_exclusive_group()
+    sold_group.add_argument("--sold", action="store_true", default=None, help="Only builds that have sold")
+    sold_group.add_argument("--unsold", dest="sold", action="store_false", default=None, help="Only builds that haven't sold")
+    export_parser.add_argument("--date-field", choices=storage.DATE_FIELDS, default="list_date",
+                               help="The date --since and --until apply to, default is %(default)s")
+    export_parser.add_argument("--since", help="Only builds with the date on or after this dd/mm/yyyy date")
+    export_parser.add_argument("--until", help="Only builds with the date on or before this dd/mm/yyyy date")
+    export_parser.set_defaults(run=run_export)
+
+    args = parser.parse_args(argv)
+    storage.STORAGE_BACKEND = args.backend
+    build_storage = storage.get_storage()
+    try:
+        return args.run(args, build_storage)
+    finally:
+        build_storage.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+import atexit
+import os
+import threading
+import time
+
+# Wait this long after the last change before writing, so bursts of changes become one write
+DEBOUNCE_SECONDS = 0.25
+# Never hold a change back for longer than this, even if changes keep coming in
+MAX_DELAY_SECONDS = 2.0
+
+
+class PersistenceWorker:
+    """
+    Background thread that writes files for the Tk thread.
+
+    Callers schedule a write by passing the path, a function that copies the data to write
+    and a function that turns the copy into the file contents. Only the copy is made with
+    the lock held, so the Tk thread isn't kept waiting while a large file is encoded.
+    Writes to the same path within the debounce window are coalesced, and each physical
+    write goes to a temp file that is swapped in with os.replace, so the file is never left
+    half written.
+    """
+    def __init__(self, debounce_seconds=DEBOUNCE_SECONDS, max_delay_seconds=MAX_DELAY_SECONDS, lock=None):
+        """
+        :param debounce_seconds: Quiet time after the last change before writing.
+        :param max_delay_seconds: Longest a change can wait before it is written.
+        :param lock: Lock guarding the data being written, held while copying it and swapping files.
+        """
+        self.debounce_seconds = debounce_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.lock = lock or threading.RLock()
+
+        self._condition = threading.Condition()
+        self._pending = {}
+        self._first_request = None
+        self._last_request = None
+        # Only one physical write at a time, whether from the worker or from flush()
+        self._io_lock = threading.Lock()
+
+        self.requested_writes = 0
+        self.coalesced_writes = 0
+        self.physical_writes = 0
+
+        self._thread = threading.Thread(target=self._run, name="persistence-worker", daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def schedule(self, path, snapshot, encode, on_replaced=None):
+        """
+        Ask for a file to be written soon.
+
+        :param path: The file to write.
+        :param snapshot: Called with the lock held, returns a copy of the data to write. Keep
+            it cheap, e.g. a shallow copy, as the Tk thread waits for the lock meanwhile.
+        :param encode: Called without the lock, returns the text to write for the snapshot.
+        :param on_replaced: Called with the lock held once the new file is in place.
+        """
+        with self._condition:
+            now = time.monotonic()
+            if self._first_request is None:
+                self._first_request = now
+            self._last_request = now
+            if path in self._pending:
+                self.coalesced_writes += 1
+            self._pending[path] = (snapshot, encode, on_replaced)
+            self.requested_writes += 1
+            self._condition.notify()
+
+    def _seconds_until_due(self):
+        """Return how long until the pending writes are due, or None if there aren't any."""
+        if not self._pending:
+            return None
+        due = min(self._last_request + self.debounce_seconds, self._first_request + self.max_delay_seconds)
+        return max(0.0, due - time.monotonic())
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while True:
+                    wait = self._seconds_until_due()
+                    if wait is None:
+                        self._condition.wait()
+                    elif wait > 0:
+                        self._condition.wait(wait)
+                    else:
+                        break
+            self._write_pending()
+
+    def _take_pending(self):
+        with self._condition:
+            pending = self._pending
+            self._pending = {}
+            self._first_request = None
+            self._last_request = None
+        return pending
+
+    def _write_pending(self):
+        with self._io_lock:
+            for path, (snapshot, encode, on_replaced) in self._take_pending().items():
+                try:
+                    self._write(path, snapshot, encode, on_replaced)
+                except Exception as e:
+                    print(f"Error writing {path}: {e}")
+
+    def _write(self, path, snapshot, encode, on_replaced):
+        with self.lock:
+            data = snapshot()
+        text = encode(data)
+
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w') as file:
+            file.write(text)
+            file.flush()
+            os.fsync(file.fileno())
+
+        with self.lock:
+            os.replace(temp_path, path)
+            if on_replaced is not None:
+                on_replaced()
+        self.physical_writes += 1
+
+    def flush(self):
+        """Write everything that is pending right now, on the calling thread."""
+        self._write_pending()
+
+    def metrics(self):
+        """Return how many writes were asked for and how many actually hit the disk."""
+        with self._condition:
+            pending = len(self._pending)
+        return {
+            "requested_writes": self.requested_writes,
+            "physical_writes": self.physical_writes,
+            "coalesced_writes": self.coalesced_writes,
+            "pending_writes": pending
+        }
@@ -0,0 +1,83 @@
+from collections import OrderedDict
+
+from PIL import ImageTk
+
+# Tk keeps every PhotoImage as 32-bit pixels, a 350x300 build photo is about 410KB
+PHOTO_CACHE_BUDGET_BYTES = 64 * 1024 * 1024
+
+
+class PhotoImageCache:
+    """
+    Tk PhotoImages of build photos, kept within a byte budget.
+
+    Rows take a photo with acquire or add and give it back with release when they scroll out
+    of view. Photos that no row is showing stay cached so scrolling back is instant, until
+    the cache goes over budget and the least recently shown of them are dropped. They are
+    loaded from the thumbnail cache again if they come back into view. Photos on screen are
+    never dropped, so the budget can be exceeded if more photos are visible than fit in it.
+
+    PhotoImages belong to Tk, so this must only be used on the Tk thread.
+    """
+    def __init__(self, budget_bytes=PHOTO_CACHE_BUDGET_BYTES):
+        self.budget_bytes = budget_bytes
+
+        # key -> [PhotoImage, size in bytes, number of rows showing it], least recently shown first
+        self._photos = OrderedDict()
+        self._total_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def acquire(self, key):
+        """Return the cached photo for key, marking it as on screen, or None if it isn't cached."""
+        entry = self._photos.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        entry[2] += 1
+        self._photos.move_to_end(key)
+        return entry[0]
+
+    def add(self, key, image):
+        """Make a PhotoImage from a PIL Image, cache it under key as on screen and return it."""
+        photo = ImageTk.PhotoImage(image)
+        previous = self._photos.pop(key, None)
+        if previous is not None:
+            self._total_bytes -= previous[1]
+
+        size = image.width * image.height * 4
+        in_use = previous[2] + 1 if previous is not None else 1
+        self._photos[key] = [photo, size, in_use]
+        self._total_bytes += size
+        self._evict()
+        return photo
+
+    def release(self, key):
+        """A row has stopped showing the photo for key, so it may be dropped if need be."""
+        entry = self._photos.get(key)
+        if entry is not None and entry[2] > 0:
+            entry[2] -= 1
+        self._evict()
+
+    def _evict(self):
+        """Drop the least recently shown photos that aren't on screen until within the budget."""
+        if self._total_bytes <= self.budget_bytes:
+            return
+        for key in [key for key, entry in self._photos.items() if entry[2] == 0]:
+            if self._total_bytes <= self.budget_bytes:
+                break
+            # Tk frees the image once the last PhotoImage reference is gone
+            self._total_bytes -= self._photos.pop(key)[1]
+            self.evictions += 1
+
+    def clear(self):
+        """Drop every photo that isn't on screen."""
+        for key in [key for key, entry in self._photos.items() if entry[2] == 0]:
+            self._total_bytes -= self._photos.pop(key)[1]
+
+    def usage(self):
+        """Return the bytes held, how many photos are cached and how many of them are on screen."""
+        on_screen = sum(1 for entry in self._photos.values() if entry[2] > 0)
+        return self._total_bytes, len(self._photos), on_screen
@@ -0,0 +1,82 @@
+import time
+
+# How long one slice of rendering may hold the Tk thread, a little under one frame at 60Hz
+FRAME_BUDGET_MS = 8
+# Gap between slices, long enough for Tk to handle input and redraw
+SLICE_GAP_MS = 1
+
+
+class RenderScheduler:
+    """
+    Works through a long list of items on the Tk thread a slice at a time.
+
+    Each slice renders items until the frame budget is used up, then hands control back to
+    Tk with window.after so clicks, scrolling and redraws still happen during a big render.
+    Starting a new render or calling cancel stops the one in progress.
+    """
+    def __init__(self, window, budget_ms=FRAME_BUDGET_MS):
+        self.window = window
+        self.budget_seconds = budget_ms / 1000
+
+        self._after_id = None
+        self._items = None
+        self._render_item = None
+        self._on_batch = None
+        self._on_done = None
+        self._start_time = 0
+        self.rendered = 0
+
+    def start(self, items, render_item, on_batch=None, on_done=None):
+        """
+        Start rendering the items, cancelling any render already in progress.
+
+        :param items: Any iterable, it is only consumed as the render goes.
+        :param render_item: Called with each item in turn.
+        :param on_batch: Called after every slice, e.g. to show the rows added in it.
+        :param on_done: Called once every item has been rendered.
+        """
+        self.cancel()
+        self._items = iter(items)
+        self._render_item = render_item
+        self._on_batch = on_batch
+        self._on_done = on_done
+        self._start_time = time.perf_counter()
+        self.rendered = 0
+        self._after_id = self.window.after(0, self._run_slice)
+
+    def _run_slice(self):
+        self._after_id = None
+        deadline = time.perf_counter() + self.budget_seconds
+        finished = False
+        while time.perf_counter() < deadline:
+            try:
+                item = next(self._items)
+            except StopIteration:
+                finished = True
+                break
+            self._render_item(item)
+            self.rendered += 1
+
+        if self._on_batch is not None:
+            self._on_batch()
+
+        if finished:
+            print(f"Rendered {self.rendered} items in {(time.perf_counter() - self._start_time) * 1000:.0f}ms")
+            on_done = self._on_done
+            self._items = None
+            if on_done is not None:
+                on_done()
+        elif self._items is not None:
+            # on_batch may have cancelled the render
+            self._after_id = self.window.after(SLICE_GAP_MS, self._run_slice)
+
+    @property
+    def running(self):
+        return self._items is not None
+
+    def cancel(self):
+        """Stop the render in progress, if any. Items already rendered are left as they are."""
+        if self._after_id is not None:
+            self.window.after_cancel(self._after_id)
+            self._after_id = None
+        self._items = None
@@ -0,0 +1,105 @@
+import math
+import time
+from collections import OrderedDict
+
+# Prefetch the rows expected to scroll into view within this long at the current speed
+PREFETCH_HORIZON_SECONDS = 0.5
+# Never prefetch more than this many rows ahead, however fast the scrolling
+PREFETCH_MAX_ROWS = 30
+# How many prefetched images to remember, so the same rows aren't prefetched over and over
+PREFETCH_MEMORY = 500
+
+
+class ScrollPrefetcher:
+    """
+    Warms the thumbnails of the rows a virtual list is about to scroll to.
+
+    Every time the view moves, the scroll direction and speed are worked out from the last
+    position, and the rows expected to come into view next (at least a page of them) are
+    prefetched by the image loader, nearest first. Reversing direction cancels prefetches
+    that haven't started, as those rows are now behind the view.
+    """
+    def __init__(self, image_loader, image_path_for, variant,
+                 horizon_seconds=PREFETCH_HORIZON_SECONDS, max_rows=PREFETCH_MAX_ROWS):
+        """
+        :param image_loader: The ImageLoader that does the prefetching.
+        :param image_path_for: Function (item) -> path of the item's image.
+        :param variant: Image variant the rows show, e.g. "list".
+        """
+        self.image_loader = image_loader
+        self.image_path_for = image_path_for
+        self.variant = variant
+        self.horizon_seconds = horizon_seconds
+        self.max_rows = max_rows
+
+        self._last_position = None
+        self._last_time = 0
+        self._direction = 0
+        # image path -> Future, for prefetches that haven't finished
+        self._pending = {}
+        # Image paths that have been prefetched, oldest first
+        self._warmed = OrderedDict()
+
+        self.prefetched = 0
+        self.cancelled = 0
+
+    def on_view_changed(self, position, first, last, items):
+        """
+        Called by VirtualScrollableFrame whenever the view moves.
+
+        :param position: Index of the row at the top of the view, with the fraction scrolled past it.
+        :param first: First row in view.
+        :param last: One past the last row in view.
+        :param items: The list's items.
+        """
+        now = time.perf_counter()
+        previous_position, previous_time = self._last_position, self._last_time
+        self._last_position, self._last_time = position, now
+        if previous_position is None or position == previous_position or now <= previous_time:
+            return
+
+        direction = 1 if position > previous_position else -1
+        if direction != self._direction:
+            # Only the prefetches go, the speed is still measured from this position next time
+            self._cancel_pending()
+            self._direction = direction
+
+        rows_per_second = abs(position - previous_position) / (now - previous_time)
+        page = max(last - first, 1)
+        rows_ahead = min(self.max_rows, max(page, math.ceil(rows_per_second * self.horizon_seconds)))
+
+        if direction > 0:
+            indices = range(last, min(len(items), last + rows_ahead))
+        else:
+            indices = range(first - 1, max(-1, first - 1 - rows_ahead), -1)
+        for index in indices:
+            self._prefetch(self.image_path_for(items[index]))
+
+    def _prefetch(self, image_path):
+        if image_path in self._pending or image_path in self._warmed:
+            return
+
+        future = self.image_loader.prefetch(image_path, self.variant)
+        self._pending[image_path] = future
+        future.add_done_callback(lambda done: self._finished(image_path, done))
+        self.prefetched += 1
+
+    def _finished(self, image_path, future):
+        # Runs on an image loader thread, each step is a single dictionary operation
+        self._pending.pop(image_path, None)
+        if not future.cancelled() and future.exception() is None:
+            self._warmed[image_path] = True
+            while len(self._warmed) > PREFETCH_MEMORY:
+                self._warmed.popitem(last=False)
+
+    def _cancel_pending(self):
+        """Cancel every prefetch that hasn't started yet."""
+        for future in list(self._pending.values()):
+            if future.cancel():
+                self.cancelled += 1
+        self._pending.clear()
+
+    def cancel(self):
+        """Cancel every prefetch that hasn't started yet and forget the view's last position."""
+        self._cancel_pending()
+        self._last_position = None
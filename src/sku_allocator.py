@@ -0,0 +1,114 @@
+import random
+from array import array
+
+# SKUs are handed out from this range, both ends included
+SKU_RANGE_START = 1000
+SKU_RANGE_END = 10000
+
+
+class SkuRangeExhaustedError(Exception):
+    """Raised when every SKU in the allocator's range is in use."""
+    pass
+
+
+class SkuAllocator:
+    """
+    Hands out random unused SKUs in constant time.
+
+    Free SKUs are kept in a list and picked at random, with the picked slot filled by the
+    last free SKU so removing it is O(1). A parallel array records where each SKU sits in
+    the free list (or -1 if it's used), so reserving or releasing a specific SKU is O(1) too.
+    """
+    def __init__(self, used_skus=(), start=SKU_RANGE_START, end=SKU_RANGE_END, extend_on_exhaustion=False):
+        """
+        :param used_skus: SKUs that are already taken.
+        :param start: First SKU in the range.
+        :param end: Last SKU in the range.
+        :param extend_on_exhaustion: Grow the range instead of raising when it is full.
+        """
+        self.start = start
+        self.end = start - 1
+        self.extend_on_exhaustion = extend_on_exhaustion
+
+        self._free = array('l')
+        self._positions = array('l')
+        # Used SKUs that fall outside the range, e.g. from an older range
+        self._outside = set()
+
+        self._extend(end - start + 1)
+        for sku in used_skus:
+            self.reserve(sku)
+
+    def _extend(self, count):
+        """Add count more SKUs to the end of the range."""
+        first = self.end + 1
+        self.end += count
+        for sku in range(first, self.end + 1):
+            if sku in self._outside:
+                # Already used before the range grew to include it
+                self._outside.discard(sku)
+                self._positions.append(-1)
+                continue
+            self._positions.append(len(self._free))
+            self._free.append(sku)
+
+    def _in_range(self, sku):
+        return self.start <= sku <= self.end
+
+    def _remove_free(self, position):
+        """Remove the free SKU at the given position by moving the last free SKU into it."""
+        sku = self._free[position]
+        last = self._free.pop()
+        if last != sku:
+            self._free[position] = last
+            self._positions[last - self.start] = position
+        self._positions[sku - self.start] = -1
+        return sku
+
+    def allocate(self):
+        """Return a random unused SKU and mark it as used."""
+        if not self._free:
+            if not self.extend_on_exhaustion:
+                raise SkuRangeExhaustedError(f"All SKUs between {self.start} and {self.end} are in use.")
+            self._extend(self.end - self.start + 1)
+        return self._remove_free(random.randrange(len(self._free)))
+
+    def reserve(self, sku):
+        """Mark a specific SKU as used. Returns False if it was already used."""
+        sku = int(sku)
+        if not self._in_range(sku):
+            if sku in self._outside:
+                return False
+            self._outside.add(sku)
+            return True
+
+        position = self._positions[sku - self.start]
+        if position == -1:
+            return False
+        self._remove_free(position)
+        return True
+
+    def release(self, sku):
+        """Put a SKU back so it can be allocated again."""
+        sku = int(sku)
+        if not self._in_range(sku):
+            self._outside.discard(sku)
+            return
+
+        if self._positions[sku - self.start] != -1:
+            return
+        self._positions[sku - self.start] = len(self._free)
+        self._free.append(sku)
+
+    def is_used(self, sku):
+        sku = int(sku)
+        if not self._in_range(sku):
+            return sku in self._outside
+        return self._positions[sku - self.start] == -1
+
+    def free_count(self):
+        return len(self._free)
+
+    def __len__(self):
+        """Number of SKUs in use."""
+        return (self.end - self.start + 1) - len(self._free) + len(self._outside)
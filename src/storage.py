@@ -0,0 +1,645 @@
+"""
+Storage backends for builds and SKUs.
+
+Everything that reads or writes builds goes through a BuildStorage, so the app doesn't
+care whether the data lives in Builds.json/SKUS.json or in a SQLite database.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from functools import lru_cache
+
+from build_journal import BuildJournal
+from build_repository import BuildRepository
+from jsonl_build_file import JsonlBuildFile
+from persistence_worker import PersistenceWorker
+from sku_allocator import SkuAllocator, SkuRangeExhaustedError
+
+BUILDS_FILE_PATH = os.path.join('..', 'data', 'Builds.json')
+SKUS_FILE_PATH = os.path.join('..', 'data', 'SKUS.json')
+DATABASE_FILE_PATH = os.path.join('..', 'data', 'Builds.db')
+JSONL_BUILDS_FILE_PATH = os.path.join('..', 'data', 'Builds.jsonl')
+
+# Which backend get_storage() uses:
+#   "json"    - rewrite Builds.json in the background after changes
+#   "journal" - append changes to a journal next to Builds.json, see BuildJournal
+#   "sqlite"  - keep everything in Builds.db, imported from the JSON files the first time
+#   "jsonl"   - append builds to Builds.jsonl with a SKU index, imported from Builds.json the first time
+STORAGE_BACKEND = "json"
+
+
+def json_file_text(data):
+    """The text of a JSON file as the app writes them, indented to stay readable."""
+    return json.dumps(data, indent=4)
+
+
+class BuildStorage:
+    """Interface for the places builds and SKUs can be stored."""
+
+    def __init__(self):
+        self._sku_allocator = None
+        # SKUs handed out for builds that haven't been saved yet, only kept in memory
+        self._sku_leases = set()
+        # Whether SKUs might have been orphaned since the last clean_unused_skus
+        self._skus_changed = True
+
+    def get_build(self, sku):
+        """Return the build record for the given SKU, or None if there isn't one."""
+        raise NotImplementedError
+
+    def get_builds_list(self):
+        """Return every build record."""
+        raise NotImplementedError
+
+    def iter_builds(self, sold=None, date_field=None, since=None, until=None):
+        """
+        Yield build records one at a time, e.g. for an export.
+
+        :param sold: Only sold builds if True, only unsold builds if False.
+        :param date_field: "list_date" or "sell_date", the date since and until apply to.
+        :param since: Only builds with the date on or after this yyyy-mm-dd date.
+        :param until: Only builds with the date on or before this yyyy-mm-dd date.
+        """
+        for build in self.get_builds_list():
+            if build_matches(build, sold, date_field, since, until):
+                yield build
+
+    def save_build(self, sku, updated_data):
+        """
+        Update an existing build based on the given SKU, or add it if it doesn't exist.
+        If the SKU was leased by generate_unique_sku, it is now recorded as used.
+
+        :param sku: The SKU of the build to update or add.
+        :param updated_data: A dictionary containing the updated fields for the build.
+        :return: True if anything was written.
+        """
+        saved = self._write_build(sku, updated_data)
+        if sku in self._sku_leases:
+            self._sku_leases.discard(sku)
+            self.add_sku(sku)
+        return saved
+
+    def _write_build(self, sku, updated_data):
+        """Backend specific part of save_build."""
+        raise NotImplementedError
+
+    def save_builds(self, builds):
+        """
+        Add or replace many complete build records at once, e.g. for an import, as a single
+        write rather than one per build. Leased SKUs among them are now recorded as used.
+
+        :param builds: Build records as produced by PCBuild.to_dict(), each with its SKU.
+        """
+        builds = list(builds)
+        self._write_builds(builds)
+        saved_skus = [build['sku'] for build in builds if build['sku'] in self._sku_leases]
+        self._sku_leases.difference_update(saved_skus)
+        self.add_skus(saved_skus)
+
+    def _write_builds(self, builds):
+        """Backend specific part of save_builds."""
+        for build in builds:
+            self._write_build(build['sku'], build)
+
+    def get_skus(self):
+        """Return the list of SKUs that are in use."""
+        raise NotImplementedError
+
+    def add_sku(self, sku):
+        """Mark a SKU as used. Returns False if it was already used."""
+        raise NotImplementedError
+
+    def add_skus(self, skus):
+        """Mark many SKUs as used."""
+        for sku in skus:
+            self.add_sku(sku)
+
+    def set_skus(self, skus):
+        """Replace the list of used SKUs."""
+        raise NotImplementedError
+
+    @property
+    def sku_allocator(self):
+        """The SkuAllocator for this storage, built from the used SKUs on first use."""
+        if self._sku_allocator is None:
+            self._sku_allocator = SkuAllocator(self.get_skus())
+        return self._sku_allocator
+
+    def generate_unique_sku(self):
+        """
+        Lease a random SKU that isn't already used.
+
+        The lease only lives in memory until a build is saved with the SKU, so abandoning a
+        new build doesn't leave anything to clean up on disk.
+        Raises SkuRangeExhaustedError if every SKU is taken.
+        """
+        new_sku = self.sku_allocator.allocate()
+        self._sku_leases.add(new_sku)
+        return new_sku
+
+    def lease_skus(self, count):
+        """
+        Lease count SKUs at once, like calling generate_unique_sku count times.
+        If there aren't enough free SKUs none are leased and SkuRangeExhaustedError is raised.
+        """
+        if count > self.sku_allocator.free_count() and not self.sku_allocator.extend_on_exhaustion:
+            raise SkuRangeExhaustedError(
+                f"{count} SKUs are needed but only {self.sku_allocator.free_count()} are free."
+            )
+        skus = [self.sku_allocator.allocate() for _ in range(count)]
+        self._sku_leases.update(skus)
+        return skus
+
+    def reserve_sku(self, sku):
+        """
+        Lease a specific SKU, e.g. one given in an import file.
+
+        :return: False if the SKU is already used or leased.
+        """
+        if not self.sku_allocator.reserve(sku):
+            return False
+        self._sku_leases.add(sku)
+        return True
+
+    def release_sku_leases(self):
+        """Give back every leased SKU that hasn't been saved with a build. No file I/O."""
+        for sku in self._sku_leases:
+            self.sku_allocator.release(sku)
+        self._sku_leases.clear()
+
+    def clean_unused_skus(self):
+        """
+        Release unsaved SKU leases and remove SKUs that don't belong to a saved build.
+        The stored SKUs are only checked if something has changed since the last time.
+        """
+        self.release_sku_leases()
+        if not self._skus_changed:
+            return
+        self._remove_unused_skus()
+        self._skus_changed = False
+
+    def _remove_unused_skus(self):
+        skus = self.get_skus()
+        unused_skus = {str(sku) for sku in skus} - {str(build["sku"]) for build in self.get_builds_list()}
+        if unused_skus:
+            self.set_skus([sku for sku in skus if str(sku) not in unused_skus])
+
+    def flush(self):
+        """Make sure every change so far has been written."""
+        pass
+
+    def close(self):
+        self.flush()
+
+
+class JsonSkuStorage(BuildStorage):
+    """
+    The SKUs part of the storages that keep them in SKUS.json.
+
+    SKUs are changed in memory and a PersistenceWorker rewrites SKUS.json in the background.
+    """
+
+    def __init__(self, skus_path=SKUS_FILE_PATH):
+        super().__init__()
+        self.skus_path = skus_path
+
+        # Guards the in-memory builds and SKUs against the writer thread
+        self._lock = threading.RLock()
+        self.writer = PersistenceWorker(lock=self._lock)
+        self._skus_data = None
+        self._sku_set = None
+
+    def _skus(self):
+        """Return the in-memory SKUs list, loading SKUS.json the first time."""
+        if self._skus_data is None:
+            with open(self.skus_path, 'r') as file:
+                self._skus_data = json.load(file)
+            self._sku_set = set(self._skus_data['SKUS'])
+        return self._skus_data['SKUS']
+
+    def _schedule_skus_write(self):
+        self.writer.schedule(self.skus_path, self._snapshot_skus, json_file_text)
+
+    def _snapshot_skus(self):
+        return dict(self._skus_data, SKUS=list(self._skus_data['SKUS']))
+
+    def get_skus(self):
+        with self._lock:
+            return list(self._skus())
+
+    def add_sku(self, sku):
+        with self._lock:
+            skus = self._skus()
+            if sku in self._sku_set:
+                return False
+            skus.append(sku)
+            self._sku_set.add(sku)
+        self._schedule_skus_write()
+        return True
+
+    def add_skus(self, skus):
+        with self._lock:
+            used = self._skus()
+            new_skus = [sku for sku in dict.fromkeys(skus) if sku not in self._sku_set]
+            if not new_skus:
+                return
+            used.extend(new_skus)
+            self._sku_set.update(new_skus)
+        self._schedule_skus_write()
+
+    def set_skus(self, skus):
+        with self._lock:
+            self._skus()
+            self._skus_data['SKUS'] = list(skus)
+            self._sku_set = set(skus)
+            self._skus_changed = True
+            self._sku_allocator = None
+        self._schedule_skus_write()
+
+    def flush(self):
+        self.writer.flush()
+
+
+class JsonBuildStorage(JsonSkuStorage):
+    """
+    Builds in Builds.json and SKUs in SKUS.json, optionally with a change journal.
+
+    Changes are made to the in-memory copy and a PersistenceWorker writes the files in the
+    background, so saving never blocks the Tk thread on a full rewrite of the file.
+    """
+
+    def __init__(self, builds_path=BUILDS_FILE_PATH, skus_path=SKUS_FILE_PATH, use_journal=False):
+        super().__init__(skus_path)
+        self.builds_path = builds_path
+        self.use_journal = use_journal
+
+        self.journal = BuildJournal(builds_path)
+        self.repository = BuildRepository(builds_path, journal=self.journal)
+
+    def get_build(self, sku):
+        with self._lock:
+            return self.repository.get(sku)
+
+    def get_builds_list(self):
+        with self._lock:
+            return self.repository.all()
+
+    def iter_unsold(self):
+        with self._lock:
+            return iter(list(self.repository.iter_unsold()))
+
+    def _write_build(self, sku, updated_data):
+        with self._lock:
+            self._skus_changed = True
+            if self.use_journal:
+                return self._append_build_to_journal(sku, updated_data)
+
+            # Fold any journaled changes into the file before it is rewritten
+            if self.journal.has_pending():
+                self.journal.compact()
+
+            if self.repository.get(sku) is None:
+                print(f"No build found with SKU {sku}. Adding a new build.")
+            self.repository.apply(sku, updated_data)
+
+        self.writer.schedule(self.builds_path, self._snapshot_builds, json_file_text, self.repository.mark_current)
+        return True
+
+    def _write_builds(self, builds):
+        changes = [(build['sku'], build) for build in builds]
+        with self._lock:
+            self._skus_changed = True
+            if self.use_journal:
+                # One append and one fsync for the whole batch
+                self.journal.append_many(changes)
+                self.repository.apply_many(changes)
+                return
+
+            if self.journal.has_pending():
+                self.journal.compact()
+            self.repository.apply_many(changes)
+
+        self.writer.schedule(self.builds_path, self._snapshot_builds, json_file_text, self.repository.mark_current)
+
+    def _snapshot_builds(self):
+        # Records are changed in place with update(), copying each one is enough for
+        # the writer thread to encode them without the lock
+        return {"builds": [dict(build) for build in self.repository.all()]}
+
+    def _append_build_to_journal(self, sku, updated_data):
+        """
+        Append only the fields that have changed to the build journal.
+        If the build doesn't exist yet, the whole build is appended.
+        """
+        existing = self.repository.get(sku)
+        if existing is None:
+            changes = dict(updated_data, sku=sku)
+        else:
+            changes = {key: value for key, value in updated_data.items() if existing.get(key) != value}
+
+        if not changes:
+            return False
+
+        self.journal.append(sku, changes)
+        self.repository.apply(sku, changes)
+        return True
+
+    def close(self):
+        self.flush()
+        # Let a compaction started by a big batch of journal appends finish first
+        self.journal.wait_for_compaction()
+
+
+class JsonlBuildStorage(JsonSkuStorage):
+    """
+    Builds one per line in Builds.jsonl with a SKU index next to it, see JsonlBuildFile,
+    and SKUs in SKUS.json.
+
+    Reading one build decodes only that build's line. Saving a build appends its updated
+    record instead of rewriting the file.
+    """
+
+    def __init__(self, builds_path=JSONL_BUILDS_FILE_PATH, skus_path=SKUS_FILE_PATH):
+        super().__init__(skus_path)
+        self.builds_path = builds_path
+        self.builds = JsonlBuildFile(builds_path)
+
+    def get_build(self, sku):
+        return self.builds.get(sku)
+
+    def get_builds_list(self):
+        return list(self.builds)
+
+    def iter_unsold(self):
+        return (build for build in self.builds if not build.get('sold', False))
+
+    def iter_builds(self, sold=None, date_field=None, since=None, until=None):
+        # Straight from the file, one build decoded at a time
+        for build in self.builds:
+            if build_matches(build, sold, date_field, since, until):
+                yield build
+
+    def _write_build(self, sku, updated_data):
+        with self._lock:
+            self._skus_changed = True
+            build = self.builds.get(sku)
+            if build is None:
+                print(f"No build found with SKU {sku}. Adding a new build.")
+                build = {}
+            elif all(build.get(key) == value for key, value in updated_data.items()):
+                # Nothing has changed, don't append another copy
+                return False
+            build.update(updated_data)
+            build['sku'] = sku
+            self.builds.append(build)
+        return True
+
+    def _write_builds(self, builds):
+        with self._lock:
+            self._skus_changed = True
+            self.builds.append_many(builds)
+
+    def close(self):
+        self.flush()
+        self.builds.close()
+
+
+# Which dates builds can be filtered on
+DATE_FIELDS = ("list_date", "sell_date")
+
+
+@lru_cache(maxsize=4096)
+def to_iso_date(date):
+    """Convert a dd/mm/yyyy date from the form to yyyy-mm-dd so it sorts, or None."""
+    try:
+        return datetime.strptime(date, "%d/%m/%Y").date().isoformat()
+    except (TypeError, ValueError):
+        return None
+
+
+def build_matches(build, sold=None, date_field=None, since=None, until=None):
+    """Check a build record against the filters of BuildStorage.iter_builds."""
+    if sold is not None and bool(build.get("sold")) != sold:
+        return False
+    if since is None and until is None:
+        return True
+
+    if date_field not in DATE_FIELDS:
+        raise ValueError(f"Can't filter on {date_field}, expected one of: {', '.join(DATE_FIELDS)}")
+    date = to_iso_date(build.get(date_field))
+    if date is None:
+        return False
+    return (since is None or date >= since) and (until is None or date <= until)
+
+
+class SqliteBuildStorage(BuildStorage):
+    """
+    Builds and SKUs in a SQLite database.
+
+    The whole build record is stored as JSON, with the SKU, sold flag and dates pulled out
+    into indexed columns so lookups and filters don't need to decode every row.
+
+    Builds come back in the order they were first added, like the JSON backends. As the SKU
+    is the rowid, that order is kept in its own seq column, which updates leave alone.
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS builds (
+            sku INTEGER PRIMARY KEY,
+            seq INTEGER,
+            sold INTEGER NOT NULL DEFAULT 0,
+            list_date TEXT,
+            sell_date TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS builds_sold ON builds (sold);
+        CREATE INDEX IF NOT EXISTS builds_list_date ON builds (list_date);
+        CREATE INDEX IF NOT EXISTS builds_sell_date ON builds (sell_date);
+        CREATE TABLE IF NOT EXISTS skus (
+            sku INTEGER PRIMARY KEY
+        );
+    """
+
+    # Made after any migration, as databases from before seq don't have the column yet
+    SEQ_INDEX = "CREATE UNIQUE INDEX IF NOT EXISTS builds_seq ON builds (seq)"
+
+    # Fixed statements, sqlite3 keeps them compiled in its statement cache
+    SELECT_BUILD = "SELECT data FROM builds WHERE sku = ?"
+    SELECT_BUILDS = "SELECT data FROM builds ORDER BY seq"
+    SELECT_UNSOLD = "SELECT data FROM builds WHERE sold = 0 ORDER BY seq"
+    # A new build goes after the last one, an existing build keeps its seq
+    UPSERT_BUILD = """
+        INSERT INTO builds (sku, seq, sold, list_date, sell_date, data)
+        VALUES (?, (SELECT IFNULL(MAX(seq), 0) + 1 FROM builds), ?, ?, ?, ?)
+        ON CONFLICT (sku) DO UPDATE SET
+            sold = excluded.sold, list_date = excluded.list_date,
+            sell_date = excluded.sell_date, data = excluded.data
+    """
+    SELECT_SKUS = "SELECT sku FROM skus ORDER BY rowid"
+    INSERT_SKU = "INSERT OR IGNORE INTO skus (sku) VALUES (?)"
+    SELECT_UNUSED_SKUS = "SELECT sku FROM skus WHERE sku NOT IN (SELECT sku FROM builds)"
+    DELETE_UNUSED_SKUS = "DELETE FROM skus WHERE sku NOT IN (SELECT sku FROM builds)"
+
+    def __init__(self, database_path=DATABASE_FILE_PATH):
+        super().__init__()
+        self.database_path = database_path
+        self.connection = sqlite3.connect(database_path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(self.SCHEMA)
+        self._add_seq_column()
+        self.connection.execute(self.SEQ_INDEX)
+
+    def _add_seq_column(self):
+        """Give a database from before the seq column one, in SKU order as that's all its rows kept."""
+        columns = [row[1] for row in self.connection.execute("PRAGMA table_info(builds)")]
+        if "seq" in columns:
+            return
+        with self.connection:
+            self.connection.execute("ALTER TABLE builds ADD COLUMN seq INTEGER")
+            self.connection.execute("UPDATE builds SET seq = rowid")
+        print(f"Added insertion order to {self.database_path}.")
+
+    @staticmethod
+    def _row_values(sku, build):
+        return (
+            int(sku),
+            1 if build.get("sold") else 0,
+            to_iso_date(build.get("list_date")),
+            to_iso_date(build.get("sell_date")),
+            json.dumps(build)
+        )
+
+    def get_build(self, sku):
+        row = self.connection.execute(self.SELECT_BUILD, (int(sku),)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_builds_list(self):
+        return [json.loads(row[0]) for row in self.connection.execute(self.SELECT_BUILDS)]
+
+    def iter_unsold(self):
+        for row in self.connection.execute(self.SELECT_UNSOLD):
+            yield json.loads(row[0])
+
+    def iter_builds(self, sold=None, date_field=None, since=None, until=None):
+        # The filters run in SQLite on the indexed columns, and rows are decoded as they're read
+        conditions, parameters = [], []
+        if sold is not None:
+            conditions.append("sold = ?")
+            parameters.append(1 if sold else 0)
+        if since is not None or until is not None:
+            if date_field not in DATE_FIELDS:
+                raise ValueError(f"Can't filter on {date_field}, expected one of: {', '.join(DATE_FIELDS)}")
+            if since is not None:
+                conditions.append(f"{date_field} >= ?")
+                parameters.append(since)
+            if until is not None:
+                conditions.append(f"{date_field} <= ?")
+                parameters.append(until)
+
+        query = "SELECT data FROM builds"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        for row in self.connection.execute(query + " ORDER BY seq", parameters):
+            yield json.loads(row[0])
+
+    def _write_build(self, sku, updated_data):
+        self._skus_changed = True
+        with self.connection:
+            build = self.get_build(sku) or {}
+            build.update(updated_data)
+            build['sku'] = sku
+            self.connection.execute(self.UPSERT_BUILD, self._row_values(sku, build))
+        return True
+
+    def _write_builds(self, builds):
+        # Every build goes in a single transaction
+        self._skus_changed = True
+        with self.connection:
+            self.connection.executemany(
+                self.UPSERT_BUILD, (self._row_values(build['sku'], build) for build in builds)
+            )
+
+    def get_skus(self):
+        return [row[0] for row in self.connection.execute(self.SELECT_SKUS)]
+
+    def add_sku(self, sku):
+        with self.connection:
+            cursor = self.connection.execute(self.INSERT_SKU, (int(sku),))
+        return cursor.rowcount == 1
+
+    def add_skus(self, skus):
+        with self.connection:
+            self.connection.executemany(self.INSERT_SKU, ((int(sku),) for sku in skus))
+
+    def set_skus(self, skus):
+        with self.connection:
+            self.connection.execute("DELETE FROM skus")
+            self.connection.executemany(self.INSERT_SKU, ((int(sku),) for sku in skus))
+        self._skus_changed = True
+        self._sku_allocator = None
+
+    def _remove_unused_skus(self):
+        with self.connection:
+            unused_skus = [row[0] for row in self.connection.execute(self.SELECT_UNUSED_SKUS)]
+            if unused_skus:
+                self.connection.execute(self.DELETE_UNUSED_SKUS)
+        if self._sku_allocator is not None:
+            for sku in unused_skus:
+                self._sku_allocator.release(sku)
+
+    def close(self):
+        self.connection.close()
+
+
+def import_json_to_sqlite(sqlite_storage, builds_path=BUILDS_FILE_PATH, skus_path=SKUS_FILE_PATH):
+    """
+    Copy every build and SKU from the JSON files into a SQLite storage.
+
+    :return: The number of builds imported.
+    """
+    json_storage = JsonBuildStorage(builds_path, skus_path)
+    builds = json_storage.get_builds_list()
+    sqlite_storage.save_builds(builds)
+    if os.path.exists(skus_path):
+        sqlite_storage.set_skus(json_storage.get_skus())
+    print(f"Imported {len(builds)} builds into {sqlite_storage.database_path}.")
+    return len(builds)
+
+
+def import_json_to_jsonl(jsonl_storage, builds_path=BUILDS_FILE_PATH):
+    """
+    Copy every build from Builds.json into a JSONL storage. SKUS.json is shared so isn't copied.
+
+    :return: The number of builds imported.
+    """
+    builds = JsonBuildStorage(builds_path).get_builds_list()
+    jsonl_storage.save_builds(builds)
+    print(f"Imported {len(builds)} builds into {jsonl_storage.builds_path}.")
+    return len(builds)
+
+
+_storage = None
+
+
+def get_storage():
+    """Return the storage the app uses, creating it on first use."""
+    global _storage
+    if _storage is None:
+        if STORAGE_BACKEND == "sqlite":
+            is_new = not os.path.exists(DATABASE_FILE_PATH)
+            _storage = SqliteBuildStorage(DATABASE_FILE_PATH)
+            if is_new and os.path.exists(BUILDS_FILE_PATH):
+                import_json_to_sqlite(_storage)
+        elif STORAGE_BACKEND == "jsonl":
+            is_new = not os.path.exists(JSONL_BUILDS_FILE_PATH)
+            _storage = JsonlBuildStorage(JSONL_BUILDS_FILE_PATH)
+            if is_new and os.path.exists(BUILDS_FILE_PATH):
+                import_json_to_jsonl(_storage)
+        elif STORAGE_BACKEND == "journal":
+            _storage = JsonBuildStorage(use_journal=True)
+        else:
+            _storage = JsonBuildStorage()
+    return _storage
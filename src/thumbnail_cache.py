@@ -0,0 +1,140 @@
+import hashlib
+import os
+import threading
+import time
+
+from PIL import Image
+
+THUMBNAIL_DIRECTORY = os.path.join('..', 'images', 'thumbnails')
+# Least recently used thumbnails are deleted once the cache grows past this
+THUMBNAIL_CACHE_BUDGET_BYTES = 200 * 1024 * 1024
+
+
+class ThumbnailCache:
+    """
+    Resized copies of build images, kept on disk so the originals only get decoded once.
+
+    Thumbnails are keyed by the original's path, modification time and size plus the
+    thumbnail size, so replacing an image gives it a new thumbnail. A thumbnail's
+    modification time is bumped every time it is used, which is what eviction goes by.
+    """
+    def __init__(self, directory=THUMBNAIL_DIRECTORY, budget_bytes=THUMBNAIL_CACHE_BUDGET_BYTES):
+        self.directory = directory
+        self.budget_bytes = budget_bytes
+
+        self._lock = threading.Lock()
+        # file name -> [last used, size in bytes], loaded from the directory on first use
+        self._entries = None
+        self._total_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    def _load_entries(self):
+        self._entries = {}
+        self._total_bytes = 0
+        if not os.path.isdir(self.directory):
+            return
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.endswith('.tmp'):
+                stat = entry.stat()
+                self._entries[entry.name] = [stat.st_mtime, stat.st_size]
+                self._total_bytes += stat.st_size
+
+    def _file_name(self, image_path, width, height):
+        stat = os.stat(image_path)
+        key = f"{os.path.abspath(image_path)}|{stat.st_mtime_ns}|{stat.st_size}|{width}x{height}"
+        return hashlib.sha1(key.encode()).hexdigest() + '.png'
+
+    def get_path(self, image_path, width, height, resize=None):
+        """
+        Return the path of a width x height thumbnail of the image, making it if needed.
+
+        :param resize: Function (image_path, width, height) -> PIL Image used to make a
+                       missing thumbnail, defaults to a plain Image.resize.
+        """
+        file_name = self._file_name(image_path, width, height)
+        thumbnail_path = os.path.join(self.directory, file_name)
+
+        with self._lock:
+            if self._entries is None:
+                self._load_entries()
+            entry = self._entries.get(file_name)
+            if entry is not None and os.path.exists(thumbnail_path):
+                self.hits += 1
+                entry[0] = time.time()
+                os.utime(thumbnail_path)
+                return thumbnail_path
+            self.misses += 1
+
+        # Resize outside the lock so other threads can use the cache meanwhile
+        if resize is None:
+            with Image.open(image_path) as original:
+                thumbnail = original.resize((width, height))
+        else:
+            thumbnail = resize(image_path, width, height)
+
+        return self._store(file_name, thumbnail)
+
+    def put(self, image_path, width, height, thumbnail):
+        """
+        Store an already resized width x height copy of the image, e.g. one of several sizes
+        made from a single decode. Returns the thumbnail's path.
+        """
+        with self._lock:
+            if self._entries is None:
+                self._load_entries()
+        return self._store(self._file_name(image_path, width, height), thumbnail)
+
+    def _store(self, file_name, thumbnail):
+        thumbnail_path = os.path.join(self.directory, file_name)
+        if thumbnail.mode not in ('1', 'L', 'LA', 'P', 'RGB', 'RGBA'):
+            # e.g. CMYK JPEGs, which PNG can't hold
+            thumbnail = thumbnail.convert('RGB')
+
+        os.makedirs(self.directory, exist_ok=True)
+        temp_path = f"{thumbnail_path}.{threading.get_ident()}.tmp"
+        thumbnail.save(temp_path, format='PNG')
+        os.replace(temp_path, thumbnail_path)
+
+        with self._lock:
+            size = os.path.getsize(thumbnail_path)
+            previous = self._entries.get(file_name)
+            if previous is not None:
+                self._total_bytes -= previous[1]
+            self._entries[file_name] = [time.time(), size]
+            self._total_bytes += size
+            self._evict(keep=file_name)
+        return thumbnail_path
+
+    def get_image(self, image_path, width, height, resize=None):
+        """Return a width x height thumbnail of the image as a loaded PIL Image."""
+        with Image.open(self.get_path(image_path, width, height, resize)) as thumbnail:
+            thumbnail.load()
+            return thumbnail
+
+    def _evict(self, keep=None):
+        """Delete least recently used thumbnails until the cache fits in its budget."""
+        if self._total_bytes <= self.budget_bytes:
+            return
+        for file_name, (last_used, size) in sorted(self._entries.items(), key=lambda item: item[1][0]):
+            if self._total_bytes <= self.budget_bytes:
+                break
+            if file_name == keep:
+                continue
+            try:
+                os.remove(os.path.join(self.directory, file_name))
+            except FileNotFoundError:
+                pass
+            del self._entries[file_name]
+            self._total_bytes -= size
+
+    def usage(self):
+        """Return the size of the cache in bytes and how many thumbnails it holds."""
+        with self._lock:
+            if self._entries is None:
+                self._load_entries()
+            return self._total_bytes, len(self._entries)
+
+
+thumbnail_cache = ThumbnailCache()
@@ -0,0 +1,60 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import analytics
+from analytics import BuildColumns
+from component_codec import encode_component
+from components import CPU, GPU, RAM, Motherboard, SSD, PSU, Case
+from pc_build import PCBuild
+
+
+def sample_record(sku, sold=True):
+    return {
+        "sku": sku,
+        "cpu": encode_component(CPU("Ryzen 5 3600", "AMD", 55.0)),
+        "gpu": encode_component(GPU("RTX 2060", "Nvidia", 175.0)),
+        "ram": encode_component(RAM("16GB 3200 MT/s", "Kingston", 45.0)),
+        "motherboard": encode_component(Motherboard("B450", "MSI", 100.0)),
+        "ssd": "SSD(1TB, Crucial, 40.0)",
+        "hdd": None,
+        "nvme": None,
+        "psu": encode_component(PSU("650W", "Corsair", 50.0)),
+        "case": encode_component(Case("H510", "NZXT", 60.0)),
+        "extra_costs": 10.0,
+        "target_sell_price": 900.0,
+        "extra_profit": 25.0,
+        "list_date": "04/10/2024",
+        "sell_date": "20/10/2024" if sold else "",
+        "sold": sold,
+        "sell_price": 1000.0 if sold else 0.0,
+    }
+
+
+class BuildColumnsMatchPCBuildTest(unittest.TestCase):
+    def check_against_pc_build(self):
+        records = [sample_record(1000), sample_record(1001, sold=False)]
+        columns = BuildColumns(records)
+        for index, record in enumerate(records):
+            build = PCBuild.from_record(record)
+            self.assertAlmostEqual(columns.total_costs()[index], build.total_price())
+            self.assertAlmostEqual(columns.realized_profits()[index], build.to_dict_name()["Total Profit"])
+        # The motherboard counts towards the cost, 535 in all
+        self.assertAlmostEqual(PCBuild.from_record(records[0]).total_price(), 535.0)
+        self.assertAlmostEqual(columns.total_realized_profit(), 1000.0 - 535.0 + 25.0)
+
+    def test_with_numpy(self):
+        if analytics.np is None:
+            self.skipTest("NumPy isn't installed")
+        self.check_against_pc_build()
+
+    def test_without_numpy(self):
+        with mock.patch.object(analytics, "np", None):
+            self.check_against_pc_build()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+import csv
+import io
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from build_export import export_builds
+from pc_build import PCBuild
+from test_analytics import sample_record
+
+
+class ListStorage:
+    """Just enough of a BuildStorage for export_builds."""
+    def __init__(self, records):
+        self.records = records
+
+    def iter_builds(self, **filters):
+        return iter(self.records)
+
+
+class ExportMatchesPCBuildTest(unittest.TestCase):
+    def test_computed_columns(self):
+        records = [sample_record(1000), sample_record(1001, sold=False)]
+        file = io.StringIO()
+        export_builds(ListStorage(records), file,
+                      columns=("sku", "total_price", "target_profit", "realized_profit"))
+        rows = list(csv.DictReader(io.StringIO(file.getvalue())))
+
+        for row, record in zip(rows, records):
+            build = PCBuild.from_record(record)
+            self.assertAlmostEqual(float(row["total_price"]), build.total_price())
+            self.assertAlmostEqual(float(row["target_profit"]), build.target_profit())
+        self.assertAlmostEqual(float(rows[0]["realized_profit"]), PCBuild.from_record(records[0]).to_dict_name()["Total Profit"])
+        self.assertEqual(rows[1]["realized_profit"], "")
+
+
+if __name__ == "__main__":
+    unittest.main()
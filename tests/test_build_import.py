@@ -0,0 +1,132 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from build_import import import_builds
+from pcflipping import run_import
+from storage import SqliteBuildStorage
+from test_analytics import sample_record
+
+
+class ImportBuildsTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.storage = SqliteBuildStorage(os.path.join(self.directory, "Builds.db"))
+        self.addCleanup(self.storage.close)
+
+    def write_jsonl(self, rows):
+        path = os.path.join(self.directory, "builds.jsonl")
+        with open(path, 'w', encoding='utf-8') as file:
+            for row in rows:
+                file.write(row if isinstance(row, str) else json.dumps(row))
+                file.write('\n')
+        return path
+
+    def write_csv(self, lines):
+        path = os.path.join(self.directory, "builds.csv")
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write("\n".join(lines) + "\n")
+        return path
+
+    def new_row(self, sku=None):
+        row = sample_record(sku)
+        del row["sku"]
+        if sku is not None:
+            row["sku"] = sku
+        return row
+
+    def stored_skus(self):
+        return [build["sku"] for build in self.storage.get_builds_list()]
+
+    def test_bad_rows_are_skipped(self):
+        bad_cpu = dict(self.new_row(), cpu=5)
+        listed_cpu = dict(self.new_row(), cpu=["Ryzen 5 3600"])
+        path = self.write_jsonl([self.new_row(1000), bad_cpu, listed_cpu, "not json", "[1, 2]",
+                                 dict(self.new_row(), list_date="2024-10-04"), self.new_row()])
+
+        result = import_builds(path, self.storage)
+
+        self.assertEqual(result.imported, 2)
+        self.assertEqual(result.skipped, 5)
+        self.assertEqual([error.split(":")[0] for error in result.errors],
+                         ["Line 2", "Line 3", "Line 4", "Line 5", "Line 6"])
+        self.assertEqual(self.stored_skus(), result.skus)
+        self.assertEqual(result.skus[0], 1000)
+        self.assertEqual(sorted(self.storage.get_skus()), sorted(result.skus))
+
+    def test_csv_rows(self):
+        header = "sku,cpu_name,cpu_brand,cpu_price,gpu_name,gpu_price,ram_name,ram_price,motherboard_name," \
+                 "motherboard_price,psu_name,psu_price,case_name,case_price,sold,sell_price,list_date"
+        path = self.write_csv([
+            header,
+            "1000,Ryzen 5 3600,AMD,55,RTX 2060,175,16GB,45,B450,100,650W,50,H510,60,yes,1000,04/10/2024",
+            "1001,i5-9400F,Intel,abc,RTX 2060,175,16GB,45,B450,100,650W,50,H510,60,no,,",
+            ",i5-9400F,Intel,60,,175,16GB,45,B450,100,650W,50,H510,60,no,,",
+        ])
+
+        result = import_builds(path, self.storage)
+
+        self.assertEqual(result.imported, 1)
+        self.assertEqual(result.errors, ["Line 3: cpu_price 'abc' isn't a number",
+                                         "Line 4: gpu_name is missing"])
+        build = self.storage.get_build(1000)
+        self.assertTrue(build["sold"])
+        self.assertEqual(build["image_file_name"], "1000.png")
+
+    def test_strict_imports_nothing_if_a_row_is_bad(self):
+        path = self.write_jsonl([self.new_row(1000), dict(self.new_row(), cpu=5), self.new_row()])
+
+        result = import_builds(path, self.storage, strict=True)
+
+        self.assertEqual(result.imported, 0)
+        self.assertEqual(result.skipped, 3)
+        self.assertEqual(self.stored_skus(), [])
+        # The SKU the file asked for was given back
+        self.assertFalse(self.storage.sku_allocator.is_used(1000))
+
+    def test_dry_run_saves_nothing(self):
+        path = self.write_jsonl([self.new_row(1000), self.new_row()])
+
+        result = import_builds(path, self.storage, dry_run=True)
+
+        self.assertEqual(result.imported, 2)
+        self.assertEqual(len(result.skus), 2)
+        self.assertEqual(self.stored_skus(), [])
+        self.assertEqual(self.storage.get_skus(), [])
+        for sku in result.skus:
+            self.assertFalse(self.storage.sku_allocator.is_used(sku))
+
+    def test_sku_collisions(self):
+        self.storage.save_build(1000, sample_record(1000))
+        self.storage.add_sku(1000)
+        path = self.write_jsonl([self.new_row(1000), self.new_row(1001), self.new_row(1001), self.new_row()])
+
+        result = import_builds(path, self.storage)
+
+        self.assertEqual(result.errors, ["Line 1: SKU 1000 is already used", "Line 3: SKU 1001 is already used"])
+        self.assertEqual(result.imported, 2)
+        self.assertEqual(result.skus[0], 1001)
+        self.assertNotIn(result.skus[1], (1000, 1001))
+        self.assertEqual(self.stored_skus(), [1000] + result.skus)
+
+    def test_command_line_reports_bad_rows(self):
+        path = self.write_jsonl([self.new_row(), dict(self.new_row(), cpu=5)])
+        args = argparse.Namespace(path=path, format=None, strict=False, dry_run=False)
+
+        self.assertEqual(run_import(args, self.storage), 1)
+        self.assertEqual(len(self.stored_skus()), 1)
+
+        args.strict = True
+        self.assertEqual(run_import(args, self.storage), 1)
+        self.assertEqual(len(self.stored_skus()), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from build_journal import BuildJournal
+
+
+class BuildJournalTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.snapshot_path = os.path.join(directory.name, "Builds.json")
+        with open(self.snapshot_path, 'w') as file:
+            json.dump({"builds": [{"sku": 1, "sold": False}, {"sku": 2, "sold": False}]}, file)
+        self.journal = BuildJournal(self.snapshot_path)
+
+    def read_snapshot(self):
+        with open(self.snapshot_path) as file:
+            return json.load(file)["builds"]
+
+    def test_replay_applies_changes_over_the_snapshot(self):
+        self.journal.append(1, {"sold": True, "sell_price": 500.0})
+        self.journal.append_many([(3, {"sold": False}), (1, {"sell_price": 550.0})])
+
+        self.assertEqual(self.journal.replay(), [
+            {"sku": 1, "sold": True, "sell_price": 550.0},
+            {"sku": 2, "sold": False},
+            {"sku": 3, "sold": False},
+        ])
+        self.assertEqual(self.journal.appends, 3)
+        # The snapshot itself is untouched until a compaction
+        self.assertEqual(len(self.read_snapshot()), 2)
+
+    def test_compaction_folds_the_log_into_the_snapshot(self):
+        self.journal.append(2, {"sold": True})
+        expected = self.journal.replay()
+
+        self.journal.compact()
+
+        self.assertFalse(self.journal.has_pending())
+        self.assertEqual(self.read_snapshot(), expected)
+        self.assertEqual(self.journal.replay(), expected)
+        self.assertEqual(self.journal.compactions, 1)
+
+    def test_interrupted_compaction_is_finished(self):
+        self.journal.append(1, {"sold": True})
+        # A crash after the log was set aside for compaction, then more appends
+        os.replace(self.journal.log_path, self.journal.compacting_path)
+        self.journal.append(1, {"sell_price": 500.0})
+
+        self.journal.compact()
+
+        self.assertFalse(self.journal.has_pending())
+        self.assertEqual(self.read_snapshot()[0], {"sku": 1, "sold": True, "sell_price": 500.0})
+
+    def test_compacts_in_background_past_the_threshold(self):
+        journal = BuildJournal(self.snapshot_path, compact_threshold=100)
+        for price in range(10):
+            journal.append(1, {"sell_price": float(price)})
+        journal.wait_for_compaction()
+        journal.compact()
+
+        self.assertGreaterEqual(journal.compactions, 1)
+        self.assertEqual(self.read_snapshot()[0]["sell_price"], 9.0)
+
+    def test_torn_last_line_is_dropped_before_appending(self):
+        self.journal.append(2, {"sold": True})
+        with open(self.journal.log_path, 'a') as file:
+            file.write('{"sku": 1, "set": {"so')
+
+        self.journal.append(1, {"sell_price": 500.0})
+
+        builds = self.journal.replay()
+        self.assertEqual(builds[0], {"sku": 1, "sold": False, "sell_price": 500.0})
+        self.assertEqual(builds[1], {"sku": 2, "sold": True})
+        with open(self.journal.log_path) as file:
+            self.assertEqual(len(file.readlines()), 2)
+
+    def test_log_that_is_only_a_torn_line(self):
+        with open(self.journal.log_path, 'w') as file:
+            file.write('{"sku": 1, "set"')
+
+        self.journal.append(1, {"sell_price": 500.0})
+
+        self.assertEqual(self.journal.replay()[0], {"sku": 1, "sold": False, "sell_price": 500.0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import gui
+from gui import GUI, Scene
+from sku_allocator import SkuRangeExhaustedError
+from storage import SqliteBuildStorage
+from test_analytics import sample_record
+
+
+def headless_gui():
+    """A stand-in GUI with mocked widgets, running the real scene and SKU methods."""
+    window = mock.Mock()
+    window.add_build_scene_built = True
+    for name in ("change_scene", "show_add_build_scene", "go_to_add_build_scene", "go_to_start_scene"):
+        method = getattr(GUI, name)
+        setattr(window, name, lambda *args, method=method: method(window, *args))
+    return window
+
+
+class AddBuildSkuTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.storage = SqliteBuildStorage(os.path.join(directory.name, "Builds.db"))
+        self.addCleanup(self.storage.close)
+        patcher = mock.patch.object(gui, "get_storage", return_value=self.storage)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.window = headless_gui()
+
+    def test_new_build_sku_is_recorded_when_saved(self):
+        self.window.go_to_add_build_scene()
+        sku = self.window.new_build_sku
+        self.storage.save_build(sku, sample_record(sku))
+
+        self.assertIn(sku, self.storage.get_skus())
+        self.window.go_to_start_scene()
+        self.assertTrue(self.storage.sku_allocator.is_used(sku))
+
+    def test_unsaved_new_build_gives_its_sku_back(self):
+        self.window.go_to_add_build_scene()
+        sku = self.window.new_build_sku
+        self.window.go_to_start_scene()
+        self.assertFalse(self.storage.sku_allocator.is_used(sku))
+
+    def test_exhausted_sku_range_stays_on_the_current_scene(self):
+        with mock.patch.object(self.storage, "generate_unique_sku", side_effect=SkuRangeExhaustedError("full")), \
+                mock.patch.object(gui.messagebox, "showerror") as showerror:
+            self.window.go_to_add_build_scene()
+        showerror.assert_called_once()
+        self.window.show_add_build_grid_frame.assert_not_called()
+
+    def test_editing_a_build_doesnt_lease_a_sku(self):
+        with mock.patch.object(self.storage, "generate_unique_sku", side_effect=SkuRangeExhaustedError("full")):
+            GUI.on_update_build(self.window, 1000, mock.Mock(image_file_name="1000.png"))
+        self.assertEqual(self.window.new_build_sku, 1000)
+        self.window.build_form.load.assert_called_once()
+        self.window.add_build_scrollable_frame.show.assert_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
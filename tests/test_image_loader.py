@@ -0,0 +1,68 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import image_variants
+from image_loader import ImageLoader
+from image_variants import VARIANT_SIZES
+from thumbnail_cache import ThumbnailCache
+
+DEFAULT_IMAGE_PATH = os.path.join(os.path.dirname(__file__), '..', 'images', 'default_image.png')
+
+
+class ImageLoaderTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        patcher = mock.patch.object(image_variants, "thumbnail_cache",
+                                    ThumbnailCache(os.path.join(self.directory, "thumbnails")))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.loader = ImageLoader(mock.Mock(), max_workers=1, default_image_path=DEFAULT_IMAGE_PATH)
+        self.addCleanup(self.loader.shutdown)
+
+    def load(self, image_path):
+        """Load a list variant and return what the callback was given."""
+        loaded = []
+        future = self.loader.load(image_path, "list", loaded.append)
+        future.exception(timeout=10)
+        self.loader._poll()
+        return loaded
+
+    def test_loads_the_variant(self):
+        image_path = os.path.join(self.directory, "1000.png")
+        Image.new("RGB", (1400, 1200), "red").save(image_path)
+
+        loaded = self.load(image_path)
+
+        self.assertEqual(len(loaded), 1)
+        self.assertEqual(loaded[0].size, VARIANT_SIZES["list"])
+        self.assertEqual(loaded[0].getpixel((0, 0)), (255, 0, 0))
+
+    def test_missing_image_shows_the_default_image(self):
+        loaded = self.load(os.path.join(self.directory, "missing.png"))
+
+        self.assertEqual(len(loaded), 1)
+        self.assertEqual(loaded[0].size, VARIANT_SIZES["list"])
+
+    def test_unreadable_image_shows_the_default_image(self):
+        image_path = os.path.join(self.directory, "broken.png")
+        with open(image_path, 'wb') as file:
+            file.write(b"not an image")
+
+        loaded = self.load(image_path)
+
+        self.assertEqual(len(loaded), 1)
+        self.assertEqual(loaded[0].size, VARIANT_SIZES["list"])
+
+
+if __name__ == "__main__":
+    unittest.main()
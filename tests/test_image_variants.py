@@ -0,0 +1,47 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from PIL import Image
+
+from image_variants import open_reduced, PREVIEW_QUALITY_SETTINGS
+
+
+class OpenReducedTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def save(self, image, name):
+        path = os.path.join(self.directory.name, name)
+        image.save(path)
+        return path
+
+    def assert_previews(self, path, expected_mode):
+        for quality in PREVIEW_QUALITY_SETTINGS:
+            image, resampling = open_reduced(path, (300, 200), quality)
+            with image:
+                self.assertEqual(image.mode, expected_mode)
+                self.assertEqual(image.resize((300, 200), resampling).size, (300, 200))
+
+    def test_large_palette_png(self):
+        image = Image.effect_noise((2000, 1500), 64).convert("RGB").quantize(64)
+        self.assertEqual(image.mode, "P")
+        self.assert_previews(self.save(image, "palette.png"), "RGB")
+
+    def test_palette_png_with_transparency(self):
+        image = Image.effect_noise((2000, 1500), 64).convert("RGB").quantize(64)
+        image.info["transparency"] = 0
+        self.assert_previews(self.save(image, "transparent.png"), "RGBA")
+
+    def test_one_bit_and_16_bit_pngs(self):
+        noise = Image.effect_noise((2000, 1500), 64)
+        self.assert_previews(self.save(noise.convert("1"), "one_bit.png"), "RGB")
+        self.assert_previews(self.save(noise.convert("I;16"), "sixteen_bit.png"), "RGB")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pc_build
+from pc_build import PCBuild
+from test_analytics import sample_record
+
+
+class SaveTest(unittest.TestCase):
+    def make_dirty_build(self):
+        build = PCBuild.from_record(sample_record(1000))
+        build.mark_dirty()
+        return build
+
+    def test_failed_save_keeps_build_dirty(self):
+        build = self.make_dirty_build()
+        storage = mock.Mock()
+        storage.save_build.side_effect = OSError("disk full")
+        with mock.patch.object(pc_build, "get_storage", return_value=storage):
+            self.assertFalse(build.save())
+        self.assertTrue(build.dirty)
+        self.assertEqual(build.writes, 0)
+
+        # Once storage works again the same save goes through
+        storage.save_build.side_effect = None
+        storage.save_build.return_value = True
+        with mock.patch.object(pc_build, "get_storage", return_value=storage):
+            self.assertTrue(build.save())
+        self.assertFalse(build.dirty)
+        self.assertEqual(build.writes, 1)
+        self.assertEqual(storage.save_build.call_count, 2)
+
+    def test_unchanged_save_counts_as_saved(self):
+        build = self.make_dirty_build()
+        storage = mock.Mock()
+        storage.save_build.return_value = False
+        with mock.patch.object(pc_build, "get_storage", return_value=storage):
+            self.assertTrue(build.save())
+        self.assertFalse(build.dirty)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from persistence_worker import PersistenceWorker
+from storage import JsonBuildStorage
+from test_analytics import sample_record
+
+
+def lock_is_free(lock):
+    """Check from another thread whether the lock could be taken, as the Tk thread would."""
+    acquired = []
+
+    def try_lock():
+        if lock.acquire(timeout=1):
+            acquired.append(True)
+            lock.release()
+
+    thread = threading.Thread(target=try_lock)
+    thread.start()
+    thread.join()
+    return bool(acquired)
+
+
+class PersistenceWorkerTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def test_only_the_snapshot_holds_the_lock(self):
+        worker = PersistenceWorker(debounce_seconds=60)
+        path = os.path.join(self.directory, "data.json")
+        held = {}
+
+        def snapshot():
+            held["snapshot"] = not lock_is_free(worker.lock)
+            return [1, 2, 3]
+
+        def encode(data):
+            held["encode"] = not lock_is_free(worker.lock)
+            return json.dumps(data)
+
+        worker.schedule(path, snapshot, encode)
+        worker.flush()
+
+        self.assertEqual(held, {"snapshot": True, "encode": False})
+        with open(path) as file:
+            self.assertEqual(json.load(file), [1, 2, 3])
+        self.assertEqual(worker.metrics()["physical_writes"], 1)
+
+    def test_json_storage_writes_a_copy_of_the_builds(self):
+        builds_path = os.path.join(self.directory, "Builds.json")
+        skus_path = os.path.join(self.directory, "SKUS.json")
+        for path, data in ((builds_path, {"builds": []}), (skus_path, {"SKUS": []})):
+            with open(path, 'w') as file:
+                json.dump(data, file)
+        build_storage = JsonBuildStorage(builds_path, skus_path)
+
+        build_storage.save_build(1000, sample_record(1000))
+        build_storage.add_sku(1000)
+        snapshot = build_storage._snapshot_builds()
+        build_storage.save_build(1000, {"sell_price": 1.0})
+        build_storage.flush()
+
+        # Changes after the snapshot don't reach into it
+        self.assertEqual(snapshot["builds"][0]["sell_price"], 1000.0)
+        with open(builds_path) as file:
+            self.assertEqual(json.load(file)["builds"][0]["sell_price"], 1.0)
+        with open(skus_path) as file:
+            self.assertEqual(json.load(file), {"SKUS": [1000]})
+
+
+if __name__ == "__main__":
+    unittest.main()
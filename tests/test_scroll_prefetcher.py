@@ -0,0 +1,64 @@
+import os
+import sys
+import unittest
+from concurrent.futures import Future
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import scroll_prefetcher
+from scroll_prefetcher import ScrollPrefetcher
+
+
+class RecordingLoader:
+    """Image loader whose prefetches never start, so they can all be cancelled."""
+    def __init__(self):
+        self.prefetched = []
+
+    def prefetch(self, image_path, variant):
+        self.prefetched.append(image_path)
+        return Future()
+
+
+class ScrollPrefetcherTest(unittest.TestCase):
+    def setUp(self):
+        self.loader = RecordingLoader()
+        self.prefetcher = ScrollPrefetcher(self.loader, lambda item: f"{item}.png", "list", max_rows=4)
+        self.items = list(range(100))
+        self.clock = iter(range(1, 100))
+
+    def scroll_to(self, row):
+        with mock.patch.object(scroll_prefetcher.time, "perf_counter", lambda: next(self.clock)):
+            self.prefetcher.on_view_changed(row, row, row + 4, self.items)
+
+    def test_reversing_cancels_pending_prefetches(self):
+        self.scroll_to(40)
+        self.scroll_to(42)
+        self.assertEqual(self.loader.prefetched, ["46.png", "47.png", "48.png", "49.png"])
+
+        self.scroll_to(41)
+        self.assertEqual(self.prefetcher.cancelled, 4)
+        self.assertEqual(self.loader.prefetched[4:], ["40.png", "39.png", "38.png", "37.png"])
+
+    def test_scrolling_after_a_reversal_keeps_prefetching(self):
+        self.scroll_to(40)
+        self.scroll_to(42)
+        self.scroll_to(41)
+        self.scroll_to(35)
+        self.assertEqual(self.loader.prefetched[8:], ["34.png", "33.png", "32.png", "31.png"])
+
+    def test_cancel_forgets_the_last_position(self):
+        self.scroll_to(40)
+        self.scroll_to(42)
+        self.prefetcher.cancel()
+        self.assertEqual(self.prefetcher.cancelled, 4)
+
+        # The first move after cancel() only gives the new starting position
+        self.scroll_to(50)
+        self.assertEqual(len(self.loader.prefetched), 4)
+        self.scroll_to(52)
+        self.assertEqual(self.loader.prefetched[4:], ["56.png", "57.png", "58.png", "59.png"])
+
+
+if __name__ == "__main__":
+    unittest.main()
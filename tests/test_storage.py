@@ -0,0 +1,71 @@
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from storage import SqliteBuildStorage
+from test_analytics import sample_record
+
+
+class SqliteBuildOrderTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.database_path = os.path.join(self.directory.name, "Builds.db")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def open_storage(self):
+        build_storage = SqliteBuildStorage(self.database_path)
+        self.addCleanup(build_storage.close)
+        return build_storage
+
+    def skus(self, builds):
+        return [build["sku"] for build in builds]
+
+    def test_builds_come_back_in_the_order_they_were_added(self):
+        build_storage = self.open_storage()
+        build_storage.save_build(1005, sample_record(1005))
+        build_storage.save_builds([sample_record(1001, sold=False), sample_record(1003)])
+        build_storage.save_build(1002, sample_record(1002, sold=False))
+        # Updating a build doesn't move it
+        build_storage.save_build(1005, {"extra_costs": 20.0})
+
+        order = [1005, 1001, 1003, 1002]
+        self.assertEqual(self.skus(build_storage.get_builds_list()), order)
+        self.assertEqual(self.skus(build_storage.iter_builds()), order)
+        self.assertEqual(self.skus(build_storage.iter_builds(sold=True)), [1005, 1003])
+        self.assertEqual(self.skus(build_storage.iter_unsold()), [1001, 1002])
+        self.assertEqual(build_storage.get_build(1005)["extra_costs"], 20.0)
+
+        build_storage.close()
+        self.assertEqual(self.skus(self.open_storage().get_builds_list()), order)
+
+    def test_database_without_seq_is_migrated(self):
+        connection = sqlite3.connect(self.database_path)
+        connection.executescript("""
+            CREATE TABLE builds (
+                sku INTEGER PRIMARY KEY,
+                sold INTEGER NOT NULL DEFAULT 0,
+                list_date TEXT,
+                sell_date TEXT,
+                data TEXT NOT NULL
+            );
+            CREATE TABLE skus (sku INTEGER PRIMARY KEY);
+        """)
+        with connection:
+            connection.execute("INSERT INTO builds (sku, data) VALUES (1003, '{\"sku\": 1003}')")
+            connection.execute("INSERT INTO builds (sku, data) VALUES (1001, '{\"sku\": 1001}')")
+        connection.close()
+
+        build_storage = self.open_storage()
+        build_storage.save_build(1000, sample_record(1000))
+        # The old rows only kept SKU order, new builds go after them
+        self.assertEqual(self.skus(build_storage.get_builds_list()), [1001, 1003, 1000])
+
+
+if __name__ == "__main__":
+    unittest.main()